@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from pyminer.bench import BASELINE_PATH, SCENARIOS, compare, load_baseline, run_scenario, save_baseline
+from pyminer.config import ConfigError, load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyminer stress benchmarks")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=600, help="frames per scenario")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown ratio before failing")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail when a scenario has no baseline to compare against (for CI)")
+    parser.add_argument("--out", type=Path, default=None, help="also write the results JSON here")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    try:
+        cfg = load_config()
+    except ConfigError as e:
+        parser.error(str(e))
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        res = run_scenario(SCENARIOS[name], cfg, args.frames, args.seed)
+        results[name] = res
+        frame = res["frame_ms"]
+        phases = "  ".join(f"{p} {v['p95']:.2f}" for p, v in res["phases_ms"].items() if v)
+        print(f"{name:<14} frame p50 {frame['p50']:.2f} p95 {frame['p95']:.2f} p99 {frame['p99']:.2f} ms | p95 {phases}")
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update(results)
+        save_baseline(baseline, args.baseline)
+        print(f"baseline updated -> {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    missing = [name for name in results if not baseline.get(name)]
+    if missing:
+        print(
+            f"WARNING no baseline for {', '.join(missing)} in {args.baseline}: not checked (record one with --update-baseline)",
+            file=sys.stderr,
+        )
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if regressions or (args.check and missing):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
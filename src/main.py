@@ -1,10 +1,134 @@
-from pyminer.config import load_config
-from pyminer.game import Game
+import argparse
+import json
+from pathlib import Path
+
+from pyminer.config import ROOT, Config, ConfigError, load_config
+from pyminer.sim import Simulation
+
+
+def run_headless(cfg: Config, rounds: int, seed: int | None):
+    for i in range(rounds):
+        sim = Simulation(cfg, None if seed is None else seed + i)
+        print(json.dumps(sim.run_round()), flush=True)
+
+
+def run_replay(cfg: Config, path: Path, round_index: int, seek: float | None, speed: float, headless: bool):
+    from pyminer.replay import ReplayPlayer, load_replay
+
+    recorded_cfg, rounds = load_replay(path)
+    if not rounds:
+        raise SystemExit(f"{path}: no rounds recorded")
+    log = rounds[round_index]
+    recorded_cfg = recorded_cfg.with_overrides(
+        {"PROFILE_EXPORT_PATH": cfg.profile_export_path, "PROFILE_OVERLAY": cfg.profile_overlay}
+    )
+    if headless:
+        player = ReplayPlayer(recorded_cfg, log)
+        player.seek(seek if seek is not None else float("inf"))
+        print(json.dumps({**player.report(), "recorded": log.summary}), flush=True)
+        return
+
+    from pyminer.game import Game
+
+    player = ReplayPlayer(recorded_cfg, log, background=True)
+    player.speed = speed
+    game = Game(recorded_cfg, player=player)
+    if seek:
+        player.seek(seek)
+        game.sim = player.sim
+    game.run()
 
 
 def main():
-    cfg = load_config()
-    Game(cfg).run()
+    parser = argparse.ArgumentParser(description="pyminer")
+    parser.add_argument("--headless", action="store_true", help="run rounds without a window as fast as possible")
+    parser.add_argument("--rounds", type=int, default=None, help="number of headless rounds (default: 1; --serve: endless)")
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed (rounds use seed, seed+1, ...)")
+    parser.add_argument("--chat-file", type=Path, default=None, help="tail 'user message' lines from this file as chat")
+    parser.add_argument("--chat-port", type=int, default=None, help="accept 'user message' lines on this local TCP port")
+    parser.add_argument("--profile-out", type=Path, default=None, help="append frame-phase timings to this JSONL file")
+    parser.add_argument("--event-log", type=Path, default=None, help="append round events to this JSONL file")
+    parser.add_argument("--record", type=Path, default=None, help="record seeds, input and commands to this replay file")
+    parser.add_argument("--replay", type=Path, default=None, help="play back a recorded replay file")
+    parser.add_argument("--replay-round", type=int, default=-1, help="round index inside the replay file (default: last)")
+    parser.add_argument("--seek", type=float, default=None, help="start replay playback at this many seconds into the round")
+    parser.add_argument("--speed", type=float, default=4.0, help="replay playback speed multiplier")
+    parser.add_argument("--serve", action="store_true", help="run rounds headless in real time and stream them to web spectators")
+    parser.add_argument("--port", type=int, default=None, help="spectator HTTP/WebSocket port (default: SPECTATOR_PORT)")
+    parser.add_argument("--booths", type=int, default=1, help="run this many independent games side by side in one window")
+    parser.add_argument("--booth-workers", type=int, default=0, help="step booth simulations on this many threads (default: interleaved)")
+    parser.add_argument("--booth-columns", type=int, default=None, help="booth tiles per row (default: up to 4)")
+    parser.add_argument("--booth-scale", type=float, default=None, help="booth tile scale (default: fit the desktop)")
+    args = parser.parse_args()
+
+    try:
+        cfg = load_config()
+    except ConfigError as e:
+        parser.error(str(e))
+    overrides = {}
+    if args.profile_out:
+        overrides["PROFILE_EXPORT_PATH"] = str(args.profile_out)
+    if args.event_log:
+        overrides["EVENT_LOG_PATH"] = str(args.event_log.resolve())
+    if args.record:
+        overrides["REPLAY_RECORD_PATH"] = str(args.record)
+    if args.port is not None:
+        overrides["SPECTATOR_PORT"] = args.port
+    if overrides:
+        cfg = cfg.with_overrides(overrides)
+    if args.booths < 1:
+        parser.error("--booths must be at least 1")
+    if args.booths > 1 and (args.replay or args.record or args.headless or args.chat_file):
+        parser.error("--booths cannot be combined with --replay, --record, --headless or --chat-file (booth i reads --chat-port + i)")
+    if args.replay:
+        run_replay(cfg, args.replay, args.replay_round, args.seek, args.speed, args.headless)
+        return
+    if args.headless:
+        run_headless(cfg, args.rounds if args.rounds is not None else 1, args.seed)
+        return
+
+    from pyminer.chat import ChatIngest, FileTailSource, SocketSource
+    from pyminer.events import EventLogWriter
+
+    chats = []
+    for i in range(args.booths):
+        source = FileTailSource(args.chat_file) if args.chat_file else SocketSource(port=args.chat_port + i) if args.chat_port else None
+        chat = None
+        if source is not None:
+            chat = ChatIngest(
+                source,
+                cfg.chat_rate_per_second,
+                cfg.chat_burst,
+                cfg.chat_handoff_max,
+            ).start()
+        chats.append(chat)
+    chat = chats[0]
+
+    event_log = None
+    if cfg.event_log_path:
+        event_log = EventLogWriter(
+            ROOT / cfg.event_log_path,
+            cfg.event_log_max_bytes,
+            cfg.event_log_backups,
+            cfg.event_log_flush_seconds,
+        ).start()
+    if args.booths > 1:
+        from pyminer.booth import Booth
+
+        serve_port = cfg.spectator_port if args.serve else None
+        Booth(cfg, args.booths, args.seed, chats, event_log, args.booth_workers, args.booth_columns, args.booth_scale, serve_port).run()
+        return
+    if args.serve:
+        from pyminer.server import GameServer
+
+        GameServer(cfg, args.seed, chat, event_log).run(args.rounds)
+        return
+
+    from pyminer.game import Game
+    from pyminer.replay import ReplayRecorder
+
+    recorder = ReplayRecorder(cfg.replay_record_path, cfg) if cfg.replay_record_path else None
+    Game(cfg, args.seed, chat, recorder, event_log=event_log).run()
 
 
 if __name__ == "__main__":
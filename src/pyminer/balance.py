@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator
+
+from pyminer.config import PATH, SCHEMA, Config
+from pyminer.sim import Simulation
+
+METRICS = ("score", "depth", "hp", "seconds")
+
+
+def _coerce(value: str, kind):
+    if kind is bool:
+        return value.lower() in ("1", "true", "yes", "on")
+    if kind is int:
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError(f"expected an integer, got {value!r}")
+        return int(number)
+    if kind is float:
+        return float(value)
+    if kind is PATH and value.lower() in ("", "null", "none"):
+        return None
+    return value
+
+
+def parse_param(spec: str) -> tuple[str, list]:
+    key, sep, values = spec.partition("=")
+    key = key.strip()
+    if not sep or not values:
+        raise ValueError(f"expected KEY=a,b,c or KEY=start:stop:step, got {spec!r}")
+    if key not in SCHEMA:
+        raise ValueError(f"unknown config key {key!r}")
+    kind = SCHEMA[key][0]
+    if ":" in values:
+        start, stop, step = (float(v) for v in values.split(":"))
+        if step <= 0:
+            raise ValueError(f"step must be positive in {spec!r}")
+        count = int(round((stop - start) / step)) + 1
+        raw = [str(round(start + i * step, 10)) for i in range(count)]
+    else:
+        raw = [v.strip() for v in values.split(",") if v.strip()]
+    try:
+        return key, [_coerce(v, kind) for v in raw]
+    except ValueError as e:
+        raise ValueError(f"{e} in {spec!r}") from None
+
+
+def expand_grid(params: list[tuple[str, list]]) -> Iterator[dict]:
+    keys = [k for k, _ in params]
+    for combo in itertools.product(*(values for _, values in params)):
+        yield dict(zip(keys, combo))
+
+
+def run_config(cfg: Config, seeds: list[int]) -> dict:
+    results = [Simulation(cfg, seed).run_round() for seed in seeds]
+    row: dict = {"rounds": len(results)}
+    for metric in METRICS:
+        values = [r[metric] for r in results]
+        row[f"{metric}_mean"] = round(statistics.fmean(values), 3)
+        row[f"{metric}_std"] = round(statistics.pstdev(values), 3)
+        row[f"{metric}_min"] = min(values)
+        row[f"{metric}_max"] = max(values)
+    row["game_over_rate"] = round(sum(r["game_over"] for r in results) / len(results), 4)
+    return row
+
+
+class ResultWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.fmt = "csv" if path.suffix.lower() == ".csv" else "jsonl"
+        self.f = path.open("w", encoding="utf-8", newline="")
+        self.csv: csv.DictWriter | None = None
+
+    def write(self, row: dict):
+        if self.fmt == "jsonl":
+            self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            if self.csv is None:
+                self.csv = csv.DictWriter(self.f, fieldnames=list(row))
+                self.csv.writeheader()
+            self.csv.writerow(row)
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+def sweep(
+    base_cfg: Config,
+    params: list[tuple[str, list]],
+    rounds: int,
+    seed: int,
+    out: Path,
+    workers: int | None = None,
+) -> int:
+    seeds = list(range(seed, seed + rounds))
+    # Validate every grid point up front so a bad value fails before any worker starts.
+    grid = [(overrides, base_cfg.with_overrides(overrides, "sweep")) for overrides in expand_grid(params)]
+    writer = ResultWriter(out)
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for overrides, cfg in grid:
+                futures[pool.submit(run_config, cfg, seeds)] = overrides
+            for fut in as_completed(futures):
+                row = dict(futures[fut])
+                row.update(fut.result())
+                writer.write(row)
+                done += 1
+    finally:
+        writer.close()
+    return done
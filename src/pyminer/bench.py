@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from pyminer.config import ROOT, Config
+from pyminer.profiler import FrameProfiler, RollingSamples
+
+BASELINE_PATH = ROOT / "bench_baseline.json"
+REPORT_PHASES = ("handle_collisions", "generate_rows", "update_particles", "draw")
+
+
+@dataclass
+class Scenario:
+    name: str
+    overrides: dict = field(default_factory=dict)
+    setup: Callable | None = None
+    per_frame: Callable | None = None
+
+
+def _setup_big_world(game):
+    if len(game.sim.blocks) < 10_000:
+        raise RuntimeError(f"world_10k generated only {len(game.sim.blocks)} blocks")
+
+
+def _tnt_storm(game, frame: int):
+    sim = game.sim
+    if frame % 3 == 0:
+        sim.trigger_tnt()
+    sim.spawn_particles(sim.player_x, sim.player_y + sim.camera_y, 250, (255, 170, 80))
+
+
+def _setup_max_fall_big(game):
+    sim = game.sim
+    sim.effects["big"] = math.inf
+    sim.effects["boost"] = math.inf
+    sim.player_vy = sim.cfg.max_fall_speed
+
+
+def _keep_falling(game, frame: int):
+    sim = game.sim
+    sim.player_vy = max(sim.player_vy, sim.cfg.fall_speed_cap)
+    sim.move_dir = 1 if (frame // 45) % 2 else -1
+
+
+def _command_flood(game, frame: int):
+    sim = game.sim
+    commands = ("tnt", "boost", "slow", "big", "shield")
+    for i in range(200):
+        user = f"viewer{(frame * 200 + i) % 20_000}"
+        sim.enqueue_command(commands[(frame + i) % len(commands)], user)
+
+
+SCENARIOS = {
+    s.name: s
+    for s in (
+        Scenario(
+            "world_10k",
+            {"SPAWN_ROWS_AHEAD": 1000, "EVICT_MARGIN_ROWS": 10_000},
+            setup=_setup_big_world,
+        ),
+        Scenario("tnt_storm", {"MAX_PARTICLES": 5000}, per_frame=_tnt_storm),
+        Scenario("max_fall_big", {}, setup=_setup_max_fall_big, per_frame=_keep_falling),
+        Scenario(
+            "command_flood",
+            {"COMMAND_COOLDOWN_SECONDS": 1, "QUEUE_POP_INTERVAL_SECONDS": 0.1},
+            per_frame=_command_flood,
+        ),
+    )
+}
+
+
+def run_scenario(scenario: Scenario, base_cfg: Config, frames: int = 600, seed: int = 1234) -> dict:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from pyminer.game import Game
+
+    cfg = base_cfg.with_overrides({"AUTO_MODE": False, "ROUND_SECONDS": 10**6, **scenario.overrides}, f"bench:{scenario.name}")
+    game = Game(cfg, seed)
+    sim = game.sim
+    sim.player_invuln_until = math.inf
+
+    gen = RollingSamples(frames + 1)
+    generate_rows = sim.generate_rows
+
+    def timed_generate_rows(start_row: int, row_count: int):
+        t = time.perf_counter_ns()
+        generate_rows(start_row, row_count)
+        gen.add(time.perf_counter_ns() - t)
+
+    sim.generate_rows = timed_generate_rows
+    if scenario.setup:
+        scenario.setup(game)
+
+    prof = FrameProfiler(window=frames)
+    sim.profiler = prof
+    dt = cfg.physics_dt
+    started = time.perf_counter()
+    for frame in range(frames):
+        prof.start_frame()
+        if scenario.per_frame:
+            scenario.per_frame(game, frame)
+        prof.lap("scenario")
+        sim.step(dt)
+        game.draw()
+        prof.lap("draw")
+        prof.end_frame(blocks=len(sim.blocks), particles=len(sim.particles), queue=len(sim.command_queue))
+    wall = time.perf_counter() - started
+
+    snap = prof.snapshot()
+    phases = {name: snap["phases_ms"].get(name) for name in REPORT_PHASES if name != "generate_rows"}
+    phases["generate_rows"] = gen.percentiles()
+    return {
+        "frames": frames,
+        "wall_s": round(wall, 3),
+        "frame_ms": snap["frame_ms"],
+        "phases_ms": phases,
+        "counters": snap["counters"],
+    }
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict, path: Path = BASELINE_PATH):
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25, floor_ms: float = 0.05) -> list[str]:
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        checks = [("frame", res["frame_ms"], base["frame_ms"])]
+        checks += [(p, res["phases_ms"].get(p), base["phases_ms"].get(p)) for p in REPORT_PHASES]
+        for label, cur, ref in checks:
+            if not cur or not ref:
+                continue
+            limit = max(ref["p95"] * (1 + tolerance), ref["p95"] + floor_ms)
+            if cur["p95"] > limit:
+                regressions.append(f"{name}/{label}: p95 {cur['p95']:.3f} ms > {limit:.3f} ms (baseline {ref['p95']:.3f})")
+    return regressions
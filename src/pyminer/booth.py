@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from pyminer.chat import ChatIngest
+from pyminer.config import Config, ConfigWatcher
+from pyminer.events import EventLogWriter
+from pyminer.game import Game, GameAssets
+from pyminer.netstate import StateEncoder
+from pyminer.quality import QualityGovernor
+from pyminer.server import WEB_ROOT
+from pyminer.sim import Simulation
+from pyminer.spectate import SpectatorHub, SpectatorServer
+
+
+class WindowSink:
+    # Tiles every booth's off-screen frame into one window, scaled down to fit the desktop.
+    def __init__(self, count: int, w: int, h: int, columns: int | None = None, scale: float | None = None):
+        columns = columns or min(count, 4)
+        rows = -(-count // columns)
+        if scale is None:
+            info = pygame.display.Info()
+            scale = 1.0
+            if info.current_w > 0 and info.current_h > 0:
+                scale = min(1.0, info.current_w * 0.95 / (columns * w), info.current_h * 0.9 / (rows * h))
+        tw, th = max(1, int(w * scale)), max(1, int(h * scale))
+        self.window = pygame.display.set_mode((columns * tw, rows * th))
+        pygame.display.set_caption(f"pyminer booth x{count}")
+        self.tiles = [pygame.Rect((i % columns) * tw, (i // columns) * th, tw, th) for i in range(count)]
+        self.scaled = (tw, th) != (w, h)
+
+    def present(self, games: list[Game], focus: int):
+        window = self.window
+        for i, (game, rect) in enumerate(zip(games, self.tiles)):
+            if self.scaled:
+                scale = pygame.transform.smoothscale if game.quality.smooth_scale else pygame.transform.scale
+                scale(game.screen, rect.size, window.subsurface(rect))
+            else:
+                window.blit(game.screen, rect)
+            label = game.text_cache.render(game.font, str(i + 1), (255, 255, 255) if i == focus else (150, 150, 160))
+            window.blit(label, (rect.right - label.get_width() - 8, rect.top + 6))
+        pygame.draw.rect(window, (145, 205, 255), self.tiles[focus], 2)
+        pygame.display.flip()
+
+
+class SpectatorSink:
+    # Streams one booth to its own spectator port, so each physical screen can follow its own round.
+    def __init__(self, cfg: Config, game: Game, port: int):
+        self.apply_config(cfg)
+        self.hub = SpectatorHub(cfg.spectator_client_queue).start()
+        self.server = SpectatorServer((cfg.spectator_host, port), self.hub, WEB_ROOT).start()
+        self.encoder: StateEncoder | None = None
+        game.on_step = self.step
+
+    def apply_config(self, cfg: Config):
+        self.keyframe_ticks = max(1, round(cfg.spectator_keyframe_seconds / cfg.physics_dt))
+
+    def step(self, sim: Simulation):
+        encoder = self.encoder
+        if encoder is None or encoder.sim is not sim:
+            encoder = self.encoder = StateEncoder(sim)
+            self.hub.publish(None, encoder.keyframe())
+            return
+        delta = encoder.delta()
+        keyframe = encoder.tick % self.keyframe_ticks == 0 or self.hub.keyframe_wanted
+        self.hub.publish(delta, encoder.keyframe() if keyframe else None)
+
+    def close(self):
+        self.server.stop()
+        self.hub.stop()
+
+
+class Booth:
+    # N independent games in one process: shared fonts/sprites/backgrounds, one window, one quality governor.
+    # Simulations step interleaved on the main thread, or on a worker pool; drawing always stays on the main thread.
+    def __init__(
+        self,
+        cfg: Config,
+        count: int,
+        seed: int | None = None,
+        chats: list[ChatIngest | None] | None = None,
+        event_log: EventLogWriter | None = None,
+        workers: int = 0,
+        columns: int | None = None,
+        scale: float | None = None,
+        serve_port: int | None = None,
+    ):
+        self.cfg = cfg
+        self.event_log = event_log
+        pygame.init()
+        self.sink = WindowSink(count, cfg.window_width, cfg.window_height, columns, scale)
+        self.frame_clock = pygame.time.Clock()
+        assets = GameAssets(cfg, count)
+        chats = chats or [None] * count
+        self.games = [
+            Game(
+                cfg,
+                None if seed is None else seed + i,
+                chats[i],
+                event_log=event_log,
+                surface=pygame.Surface((cfg.window_width, cfg.window_height)).convert(),
+                assets=assets,
+                instance=i,
+                # Booth i plays seed+i, seed+i+count, ... so no two booths ever share a round.
+                seed_step=count,
+            )
+            for i in range(count)
+        ]
+        for game in self.games:
+            game.config_watcher = None
+            game.governor = None
+        self.config_watcher = ConfigWatcher()
+        self.spectators = [] if serve_port is None else [SpectatorSink(cfg, game, serve_port + i) for i, game in enumerate(self.games)]
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="booth") if workers > 0 else None
+        self.focus = 0
+        self.governor = None
+        if cfg.quality_governor:
+            self.governor = QualityGovernor(
+                cfg.frame_dt,
+                cfg.quality_window_frames,
+                cfg.quality_high_water,
+                cfg.quality_low_water,
+                cfg.quality_recover_seconds,
+            )
+
+    def handle_key(self, key: int):
+        if key == pygame.K_TAB:
+            self.games[self.focus].sim.move_dir = 0
+            self.focus = (self.focus + 1) % len(self.games)
+        else:
+            self.games[self.focus].handle_key(key)
+
+    def update(self, dt: float) -> list[int]:
+        if self.pool is None:
+            return [game.update(dt) for game in self.games]
+        return list(self.pool.map(lambda game: game.update(dt), self.games))
+
+    def run(self):
+        games = self.games
+        running = True
+        try:
+            while running:
+                dt = self.frame_clock.tick(self.cfg.fps) / 1000.0
+                frame_start = time.perf_counter()
+                for game in games:
+                    game.profiler.start_frame()
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                        self.handle_key(event.key)
+                games[self.focus].read_movement(pygame.key.get_pressed())
+
+                cfg = self.config_watcher.poll(self.cfg)
+                if cfg is not None:
+                    if self.governor is not None and cfg.frame_dt != self.cfg.frame_dt:
+                        self.governor.set_budget(cfg.frame_dt)
+                    self.cfg = cfg
+                    for game in games:
+                        game.apply_config(cfg)
+                    for sink in self.spectators:
+                        sink.apply_config(cfg)
+                for game in games:
+                    game.poll_input()
+                    game.profiler.lap("input")
+
+                steps = self.update(dt)
+                drawn = [game.render(n) for game, n in zip(games, steps)]
+                if any(drawn):
+                    self.sink.present(games, self.focus)
+                if self.governor is not None:
+                    busy = dt if not any(drawn) else time.perf_counter() - frame_start
+                    if self.governor.update(busy, time.monotonic()):
+                        for game in games:
+                            game.quality = self.governor.quality
+                for game, n in zip(games, steps):
+                    game.profiler.lap("draw")
+                    game.end_frame(n)
+                deadline = frame_start + self.cfg.frame_dt * 0.75
+                for game in games:
+                    game.build_ahead(deadline)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        for sink in self.spectators:
+            sink.close()
+        for game in self.games:
+            game.close()
+        if self.event_log is not None:
+            self.event_log.stop()
+        pygame.quit()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import socketserver
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+from pyminer.sim import COMMANDS
+
+Emit = Callable[[str, str], None]
+# Chat names come from outside; longer ones are cut so they stay cheap to key, log and record.
+MAX_USER_CHARS = 64
+
+
+def parse_line(line: str) -> tuple[str, str] | None:
+    parts = line.strip().split(maxsplit=1)
+    if len(parts) != 2:
+        return None
+    user, text = parts
+    return user.rstrip(":"), text
+
+
+def parse_command(text: str) -> str | None:
+    word = text.strip().split(maxsplit=1)[0].lstrip("!").lower() if text.strip() else ""
+    return word if word in COMMANDS else None
+
+
+class ChatSource:
+    # Adapters (file tail, local socket, a YouTube live-chat poller later) call
+    # emit(user, message) for every chat message until stop is set.
+    def run(self, emit: Emit, stop: threading.Event):
+        raise NotImplementedError
+
+
+class FileTailSource(ChatSource):
+    def __init__(self, path: Path, poll_seconds: float = 0.1, from_start: bool = False):
+        self.path = Path(path)
+        self.poll_seconds = poll_seconds
+        self.from_start = from_start
+
+    def run(self, emit: Emit, stop: threading.Event):
+        self.path.touch(exist_ok=True)
+        with self.path.open("r", encoding="utf-8") as f:
+            if not self.from_start:
+                f.seek(0, 2)
+            buf = ""
+            while not stop.is_set():
+                chunk = f.readline()
+                if not chunk:
+                    stop.wait(self.poll_seconds)
+                    continue
+                buf += chunk
+                if not buf.endswith("\n"):
+                    continue
+                parsed = parse_line(buf)
+                buf = ""
+                if parsed:
+                    emit(*parsed)
+
+
+class SocketSource(ChatSource):
+    def __init__(self, host: str = "127.0.0.1", port: int = 7777):
+        self.host = host
+        self.port = port
+
+    def run(self, emit: Emit, stop: threading.Event):
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    if stop.is_set():
+                        return
+                    parsed = parse_line(raw.decode("utf-8", "replace"))
+                    if parsed:
+                        emit(*parsed)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        with Server((self.host, self.port), Handler) as server:
+            server.timeout = 0.2
+            while not stop.is_set():
+                server.handle_request()
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+
+    def take(self, now: float, rate: float, burst: float) -> bool:
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class ChatIngest:
+    def __init__(
+        self,
+        source: ChatSource,
+        rate_per_second: float = 0.5,
+        burst: float = 3.0,
+        handoff_max: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source = source
+        self.rate = rate_per_second
+        self.burst = burst
+        self.clock = clock
+        # deque.append/popleft are atomic, so the game thread drains without a lock;
+        # when full, appending silently pushes out the oldest event.
+        self.handoff: deque[tuple[str, str]] = deque(maxlen=handoff_max)
+        self.buckets: dict[str, TokenBucket] = {}
+        self.last_prune = clock()
+        self.received = 0
+        self.invalid = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="chat-ingest", daemon=True)
+
+    def start(self) -> ChatIngest:
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
+
+    def _run(self):
+        self.source.run(self.emit, self.stop_event)
+
+    def emit(self, user: str, text: str):
+        with self.lock:
+            self._accept(user, text)
+
+    def _accept(self, user: str, text: str):
+        self.received += 1
+        user = user[:MAX_USER_CHARS]
+        cmd = parse_command(text)
+        if cmd is None:
+            self.invalid += 1
+            return
+        now = self.clock()
+        bucket = self.buckets.get(user)
+        if bucket is None:
+            bucket = self.buckets[user] = TokenBucket(self.burst, now)
+        if not bucket.take(now, self.rate, self.burst):
+            self.rate_limited += 1
+            return
+        if len(self.handoff) == self.handoff.maxlen:
+            self.dropped += 1
+        self.handoff.append((user, cmd))
+        if now - self.last_prune > 30.0:
+            self._prune(now)
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely behaves like a brand-new one.
+        refill = self.burst / self.rate if self.rate > 0 else float("inf")
+        self.buckets = {u: b for u, b in self.buckets.items() if now - b.updated_at < refill}
+        self.last_prune = now
+
+    def drain(self, limit: int = 256) -> list[tuple[str, str]]:
+        out = []
+        handoff = self.handoff
+        while handoff and len(out) < limit:
+            try:
+                out.append(handoff.popleft())
+            except IndexError:
+                break
+        return out
@@ -1,25 +1,298 @@
 from __future__ import annotations
 
 import json
+import os
+import sys
+import time
 from pathlib import Path
 
+from pyminer.world import HAZARD, max_hp_by_kind
+
 ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_CONFIG_PATH = ROOT / "default.config.json"
 CONFIG_PATH = ROOT / "config.json"
 
+PATH = "path"
 
-def load_config() -> dict:
-    with DEFAULT_CONFIG_PATH.open("r", encoding="utf-8") as f:
-        default_cfg = json.load(f)
+# key: (type, minimum, maximum). Bounds are inclusive; None means unbounded.
+SCHEMA: dict[str, tuple[type | str, float | None, float | None]] = {
+    "WINDOW_WIDTH": (int, 120, 7680),
+    "WINDOW_HEIGHT": (int, 120, 4320),
+    "FPS": (int, 1, 1000),
+    "PHYSICS_HZ": (int, 1, 1000),
+    "MAX_STEPS_PER_FRAME": (int, 1, None),
+    "COLLISION_SUBSTEPS_MAX": (int, 1, 64),
+    "RENDER_SKIP_MAX": (int, 0, None),
+    "QUALITY_GOVERNOR": (bool, None, None),
+    "QUALITY_WINDOW_FRAMES": (int, 1, None),
+    "QUALITY_HIGH_WATER": (float, 0.05, 2),
+    "QUALITY_LOW_WATER": (float, 0.01, 2),
+    "QUALITY_RECOVER_SECONDS": (float, 0, None),
+    "SPECTATOR_HOST": (str, None, None),
+    "SPECTATOR_PORT": (int, 0, 65535),
+    "SPECTATOR_KEYFRAME_SECONDS": (float, 0.1, None),
+    "SPECTATOR_CLIENT_QUEUE": (int, 16, None),
+    "SPECTATOR_RESULT_SECONDS": (float, 0, None),
+    "ROUND_SECONDS": (float, 1, None),
+    "PLAYER_RADIUS": (int, 1, None),
+    "PLAYER_BASE_SPEED": (float, 0, None),
+    "GRAVITY": (float, 0, None),
+    "BLOCK_SIZE": (int, 4, None),
+    "SPAWN_ROWS_AHEAD": (int, 1, None),
+    "BLOCK_HP": (int, 1, 253),
+    "COMMAND_COOLDOWN_SECONDS": (float, 0, None),
+    "QUEUE_POP_INTERVAL_SECONDS": (float, 0, None),
+    "SPONSOR_SKILL_INTERVAL_SECONDS": (float, 0, None),
+    "BOOST_DURATION_SECONDS": (float, 0, None),
+    "SLOW_DURATION_SECONDS": (float, 0, None),
+    "BIG_DURATION_SECONDS": (float, 0, None),
+    "SHIELD_DURATION_SECONDS": (float, 0, None),
+    "TNT_RADIUS": (float, 0, None),
+    "AUTO_MODE": (bool, None, None),
+    "BLOCK_CONTACT_COOLDOWN_SECONDS": (float, 0, None),
+    "HAZARD_INVULN_SECONDS": (float, 0, None),
+    "IMPACT_HITSTOP_MAX_SECONDS": (float, 0, 1),
+    "RESTITUTION_NORMAL": (float, 0, 1),
+    "RESTITUTION_HAZARD": (float, 0, 1),
+    "PICKAXE_SCALE": (float, 0.1, 10),
+    "TOP_CLEAR_ROWS": (int, 0, None),
+    "AUTO_FALL_MUL": (float, 0, None),
+    "GRAVITY_MUL": (float, 0, None),
+    "PLAYER_START_FALL_SPEED": (float, None, None),
+    "AIR_CONTROL": (float, 0, None),
+    "MAX_FALL_SPEED": (float, 0, None),
+    "WALL_FRICTION": (float, 0, 1),
+    "CHUNK_ROWS": (int, 1, None),
+    "EVICT_MARGIN_ROWS": (int, 0, None),
+    "MAX_PARTICLES": (int, 1, None),
+    "HUD_TEXT_CACHE_SIZE": (int, 1, None),
+    "CHAT_RATE_PER_SECOND": (float, 0, None),
+    "CHAT_BURST": (float, 1, None),
+    "CHAT_HANDOFF_MAX": (int, 1, None),
+    "PROFILE_OVERLAY": (bool, None, None),
+    "PROFILE_WINDOW_FRAMES": (int, 1, None),
+    "PROFILE_EXPORT_PATH": (PATH, None, None),
+    "PROFILE_EXPORT_SECONDS": (float, 0, None),
+    "TERRAIN_PREFETCH_CHUNKS": (int, 0, None),
+    "REPLAY_RECORD_PATH": (PATH, None, None),
+    "EVENT_LOG_PATH": (PATH, None, None),
+    "EVENT_LOG_MAX_BYTES": (int, 1024, None),
+    "EVENT_LOG_BACKUPS": (int, 0, None),
+    "EVENT_LOG_FLUSH_SECONDS": (float, 0.01, None),
+    "LEADERBOARD_SIZE": (int, 1, None),
+    "LEADERBOARD_CAPACITY": (int, 1, None),
+    "LEADERBOARD_SKETCH_WIDTH": (int, 16, None),
+    "LEADERBOARD_SKETCH_DEPTH": (int, 1, 16),
+    "LEADERBOARD_COMMAND_CREDIT": (float, 0, None),
+    "LEADERBOARD_CREDITS_PER_STEP": (int, 1, None),
+}
 
-    if not CONFIG_PATH.exists():
-        with CONFIG_PATH.open("w", encoding="utf-8") as f:
-            json.dump(default_cfg, f, ensure_ascii=False, indent=2)
-        return default_cfg
+# Keys baked into windows, sprite tables, arrays and threads at startup; hot reload leaves them alone.
+RESTART_KEYS = frozenset(
+    {
+        "WINDOW_WIDTH",
+        "WINDOW_HEIGHT",
+        "BLOCK_SIZE",
+        "BLOCK_HP",
+        "TOP_CLEAR_ROWS",
+        "CHUNK_ROWS",
+        "MAX_PARTICLES",
+        "HUD_TEXT_CACHE_SIZE",
+        "CHAT_RATE_PER_SECOND",
+        "CHAT_BURST",
+        "CHAT_HANDOFF_MAX",
+        "PROFILE_WINDOW_FRAMES",
+        "PROFILE_EXPORT_PATH",
+        "PROFILE_EXPORT_SECONDS",
+        "TERRAIN_PREFETCH_CHUNKS",
+        "REPLAY_RECORD_PATH",
+        "EVENT_LOG_PATH",
+        "EVENT_LOG_MAX_BYTES",
+        "EVENT_LOG_BACKUPS",
+        "EVENT_LOG_FLUSH_SECONDS",
+        "LEADERBOARD_SIZE",
+        "LEADERBOARD_CAPACITY",
+        "LEADERBOARD_SKETCH_WIDTH",
+        "LEADERBOARD_SKETCH_DEPTH",
+        "QUALITY_GOVERNOR",
+        "QUALITY_WINDOW_FRAMES",
+        "QUALITY_HIGH_WATER",
+        "QUALITY_LOW_WATER",
+        "QUALITY_RECOVER_SECONDS",
+        "SPECTATOR_HOST",
+        "SPECTATOR_PORT",
+        "SPECTATOR_CLIENT_QUEUE",
+    }
+)
+
+DERIVED = (
+    "gravity_accel",
+    "fall_speed_cap",
+    "cols",
+    "frame_dt",
+    "physics_dt",
+    "block_max_hp",
+    "effect_seconds",
+    "restitution_by_kind",
+    "pickaxe_base_radius",
+)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _check(source: str, key: str, value, kind, lo, hi):
+    if kind is PATH:
+        if value is not None and not isinstance(value, str):
+            raise ConfigError(f"{source}: {key} must be a path string or null, got {value!r}")
+        return value
+    if kind is str:
+        if not isinstance(value, str):
+            raise ConfigError(f"{source}: {key} must be a string, got {value!r}")
+        return value
+    if kind is bool:
+        if not isinstance(value, bool):
+            raise ConfigError(f"{source}: {key} must be true or false, got {value!r}")
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (kind is int and not isinstance(value, int)):
+        name = "an integer" if kind is int else "a number"
+        raise ConfigError(f"{source}: {key} must be {name}, got {value!r}")
+    if (lo is not None and value < lo) or (hi is not None and value > hi):
+        bounds = f">= {lo}" if hi is None else f"<= {hi}" if lo is None else f"between {lo} and {hi}"
+        raise ConfigError(f"{source}: {key} must be {bounds}, got {value!r}")
+    return value
+
+
+class Config:
+    __slots__ = tuple(key.lower() for key in SCHEMA) + DERIVED + ("source",)
+
+    def __init__(self, values: dict, source: str = "config"):
+        unknown = sorted(set(values) - SCHEMA.keys())
+        if unknown:
+            raise ConfigError(f"{source}: unknown key(s) {', '.join(unknown)}")
+        missing = sorted(SCHEMA.keys() - set(values))
+        if missing:
+            raise ConfigError(f"{source}: missing key(s) {', '.join(missing)}")
+        # Instances are shared by simulations, replay snapshots and worker processes, so they are read-only.
+        set_ = object.__setattr__
+        set_(self, "source", source)
+        for key, (kind, lo, hi) in SCHEMA.items():
+            set_(self, key.lower(), _check(source, key, values[key], kind, lo, hi))
+        if self.block_size > self.window_width:
+            raise ConfigError(f"{source}: BLOCK_SIZE ({self.block_size}) is wider than WINDOW_WIDTH ({self.window_width})")
+        if self.quality_low_water >= self.quality_high_water:
+            raise ConfigError(f"{source}: QUALITY_LOW_WATER must be below QUALITY_HIGH_WATER")
+
+        set_(self, "gravity_accel", self.gravity * self.gravity_mul)
+        set_(self, "fall_speed_cap", self.max_fall_speed * 0.72)
+        set_(self, "cols", self.window_width // self.block_size)
+        set_(self, "frame_dt", 1.0 / self.fps)
+        set_(self, "physics_dt", 1.0 / self.physics_hz)
+        set_(self, "block_max_hp", max_hp_by_kind(self.block_hp))
+        set_(
+            self,
+            "effect_seconds",
+            {
+                "boost": self.boost_duration_seconds,
+                "slow": self.slow_duration_seconds,
+                "big": self.big_duration_seconds,
+                "shield": self.shield_duration_seconds,
+            },
+        )
+        set_(self, "restitution_by_kind", (self.restitution_normal,) * HAZARD + (self.restitution_hazard,))
+        set_(self, "pickaxe_base_radius", max(self.player_radius, self.block_size * 0.45 * self.pickaxe_scale))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is read-only; use with_overrides()")
+
+    def __getstate__(self):
+        return (self.to_dict(), self.source)
+
+    def __setstate__(self, state):
+        Config.__init__(self, *state)
+
+    def __copy__(self):
+        return self
 
-    with CONFIG_PATH.open("r", encoding="utf-8") as f:
-        user_cfg = json.load(f)
+    def __deepcopy__(self, memo):
+        return self
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key.lower()) for key in SCHEMA}
+
+    def with_overrides(self, overrides: dict, source: str | None = None) -> Config:
+        return Config({**self.to_dict(), **overrides}, source or self.source)
+
+    def diff(self, other: Config) -> list[str]:
+        return [key for key in SCHEMA if getattr(self, key.lower()) != getattr(other, key.lower())]
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{path.name}: invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}") from None
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path.name}: expected a JSON object")
+    return data
+
+
+def load_config(path: Path = CONFIG_PATH) -> Config:
+    default_cfg = _read_json(DEFAULT_CONFIG_PATH)
+
+    if not path.exists():
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(default_cfg, f, ensure_ascii=False, indent=2)
+        return Config(default_cfg, DEFAULT_CONFIG_PATH.name)
 
     merged = dict(default_cfg)
-    merged.update(user_cfg)
-    return merged
+    merged.update(_read_json(path))
+    return Config(merged, path.name)
+
+
+class ConfigWatcher:
+    def __init__(self, poll_seconds: float = 0.5, path: Path = CONFIG_PATH):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.next_poll = time.monotonic() + poll_seconds
+        self.mtime = self._mtime()
+        # Reloads are diffed against the file as last read, not the running Config: that one also carries
+        # CLI overrides (--event-log, --record, --port), which the file never contains.
+        try:
+            self.loaded: Config | None = load_config(path)
+        except ConfigError:
+            self.loaded = None
+
+    def _mtime(self) -> float | None:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def poll(self, current: Config) -> Config | None:
+        now = time.monotonic()
+        if now < self.next_poll:
+            return None
+        self.next_poll = now + self.poll_seconds
+        mtime = self._mtime()
+        if mtime == self.mtime:
+            return None
+        self.mtime = mtime
+        try:
+            fresh = load_config(self.path)
+        except ConfigError as e:
+            print(f"config reload rejected, keeping previous values: {e}", file=sys.stderr)
+            return None
+
+        changed = (self.loaded or current).diff(fresh)
+        self.loaded = fresh
+        held = [key for key in changed if key in RESTART_KEYS]
+        if held:
+            print(f"config reload: restart needed for {', '.join(held)}", file=sys.stderr)
+        live = {key: getattr(fresh, key.lower()) for key in changed if key not in RESTART_KEYS}
+        if not live:
+            return None
+        print(f"config reloaded: {', '.join(live)}", file=sys.stderr)
+        return current.with_overrides(live)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import Counter, deque
+from pathlib import Path
+from typing import Callable
+
+from pyminer.leaderboard import Leaderboard
+
+Event = dict
+Subscriber = Callable[[Event], None]
+
+
+class EventBus:
+    def __init__(self):
+        self.subscribers: list[Subscriber] = []
+
+    def subscribe(self, fn: Subscriber):
+        self.subscribers.append(fn)
+
+    def unsubscribe(self, fn: Subscriber):
+        self.subscribers.remove(fn)
+
+    def publish(self, event: Event):
+        for fn in self.subscribers:
+            fn(event)
+
+
+class RoundStats:
+    def __init__(self, leaderboard: Leaderboard | None = None):
+        self.leaderboard = leaderboard if leaderboard is not None else Leaderboard()
+        self.commands: Counter[str] = Counter()
+        self.skills: Counter[str] = Counter()
+        self.blocks: Counter[str] = Counter()
+        self.summary: dict | None = None
+
+    def add(self, event: Event):
+        kind = event["type"]
+        if kind == "block_break":
+            self.blocks[event["kind"]] += 1
+        elif kind == "tnt":
+            self.blocks.update(event["blocks"])
+        elif kind == "command":
+            self.commands[event["cmd"]] += 1
+        elif kind == "skill":
+            self.skills[event["name"]] += 1
+        elif kind == "round_end":
+            self.summary = {k: v for k, v in event.items() if k not in ("type", "t")}
+
+    def top_participants(self, n: int = 3) -> list[tuple[str, float]]:
+        return self.leaderboard.top_k(n)
+
+
+class EventLogWriter:
+    def __init__(self, path: str | Path, max_bytes: int = 10_000_000, backups: int = 5, flush_seconds: float = 1.0, max_pending: int = 65536):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_seconds = flush_seconds
+        # Same handoff as chat ingest: the game thread only appends, the writer thread pops.
+        self.pending: deque[Event] = deque(maxlen=max_pending)
+        self.dropped = 0
+        self.written = 0
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+
+    def start(self) -> EventLogWriter:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+        self.thread.join(timeout=2.0)
+
+    def publish(self, event: Event):
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(event)
+        if event["type"] == "round_end":
+            self.wake.set()
+
+    def _rotate(self, f):
+        f.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        return self.path.open("ab")
+
+    def _run(self):
+        # Binary, so tell() and the rotation check count bytes, not characters of non-ASCII chat names.
+        f = self.path.open("ab")
+        try:
+            while True:
+                self.wake.wait(self.flush_seconds)
+                self.wake.clear()
+                stopping = self.stop_event.is_set()
+                lines = []
+                sync = stopping
+                pending = self.pending
+                while pending:
+                    try:
+                        event = pending.popleft()
+                    except IndexError:
+                        break
+                    lines.append(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+                    sync = sync or event["type"] == "round_end"
+                if lines:
+                    data = ("\n".join(lines) + "\n").encode("utf-8")
+                    if f.tell() and f.tell() + len(data) > self.max_bytes:
+                        f = self._rotate(f)
+                    f.write(data)
+                    f.flush()
+                    self.written += len(lines)
+                if sync:
+                    os.fsync(f.fileno())
+                if stopping:
+                    return
+        finally:
+            f.close()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.entries: OrderedDict[tuple[str, pygame.font.Font, tuple[int, int, int]], pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+        key = (text, font, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return surface
+
+
+class HudLayer:
+    def __init__(
+        self,
+        text_cache: TextCache,
+        font: pygame.font.Font,
+        pos: tuple[int, int],
+        size: tuple[int, int],
+        line_count: int,
+        fill: tuple[int, int, int, int] = (10, 10, 14, 150),
+        color: tuple[int, int, int] = (238, 238, 240),
+        padding: tuple[int, int] = (10, 8),
+        line_height: int = 22,
+    ):
+        self.text_cache = text_cache
+        self.font = font
+        self.pos = pos
+        self.fill = fill
+        self.color = color
+        self.padding = padding
+        self.line_height = line_height
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface.fill(fill)
+        self.lines: list[str | None] = [None] * line_count
+        self.dirty: set[int] = set()
+
+    def set_line(self, index: int, text: str) -> bool:
+        if self.lines[index] == text:
+            return False
+        self.lines[index] = text
+        self.dirty.add(index)
+        return True
+
+    def _line_rect(self, index: int) -> pygame.Rect:
+        return pygame.Rect(0, self.padding[1] + index * self.line_height, self.surface.get_width(), self.line_height)
+
+    def compose(self) -> list[pygame.Rect]:
+        rects = []
+        for index in sorted(self.dirty):
+            rect = self._line_rect(index)
+            self.surface.fill(self.fill, rect)
+            text = self.lines[index]
+            if text:
+                self.surface.blit(self.text_cache.render(self.font, text, self.color), (self.padding[0], rect.y))
+            rects.append(rect.move(self.pos))
+        self.dirty.clear()
+        return rects
+
+    def draw(self, target: pygame.Surface, area: pygame.Rect | None = None):
+        if area is None:
+            target.blit(self.surface, self.pos)
+        else:
+            target.blit(self.surface, area.topleft, area.move(-self.pos[0], -self.pos[1]))
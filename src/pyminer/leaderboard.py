@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+from collections import deque
+
+
+class Leaderboard:
+    def __init__(self, k: int = 10, capacity: int = 1024, sketch_width: int = 2048, sketch_depth: int = 4):
+        self.k = k
+        self.capacity = max(capacity, k)
+        # Space-saving: credit for at most `capacity` users; the heaviest ones survive eviction.
+        self.counts: dict[str, float] = {}
+        self.errors: dict[str, float] = {}
+        self.heap: list[tuple[float, str]] = []
+        # Count-min sketch over every user, so an evicted user re-enters near their real credit.
+        # A flat list beats an ndarray here: every update touches only `sketch_depth` scalars.
+        self.sketch = [0.0] * (sketch_width * sketch_depth)
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.top: list[tuple[str, float]] = []
+        self.top_users: set[str] = set()
+        self.total = 0.0
+        self.version = 0
+        # Credits for big coalesced commands are queued and applied a few hundred users per frame.
+        self.pending: deque[list] = deque()
+        self.pending_users = 0
+
+    def _cells(self, user: str) -> list[int]:
+        h = int.from_bytes(hashlib.blake2b(user.encode("utf-8"), digest_size=8).digest(), "little")
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        w = self.sketch_width
+        return [row * w + (h1 + row * h2) % w for row in range(self.sketch_depth)]
+
+    def sketch_estimate(self, user: str) -> float:
+        sketch = self.sketch
+        return min(sketch[i] for i in self._cells(user))
+
+    def estimate(self, user: str) -> float:
+        count = self.counts.get(user)
+        return count if count is not None else self.sketch_estimate(user)
+
+    def add(self, user: str, amount: float):
+        if amount <= 0:
+            return
+        self.total += amount
+        sketch = self.sketch
+        cells = self._cells(user)
+        prior = min(sketch[i] for i in cells)
+        for i in cells:
+            sketch[i] += amount
+
+        count = self.counts.get(user)
+        if count is None:
+            count = 0.0
+            if len(self.counts) >= self.capacity:
+                # Both the evicted minimum and the sketch over-estimate the newcomer, so take the tighter one.
+                count = min(self._evict(), prior)
+            self.errors[user] = count
+        count += amount
+        self.counts[user] = count
+        heapq.heappush(self.heap, (count, user))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(c, u) for u, c in self.counts.items()]
+            heapq.heapify(self.heap)
+        self._update_top(user, count)
+
+    def add_many(self, users: list[str], amount: float):
+        if users and amount > 0:
+            self.pending.append([users, amount, 0])
+            self.pending_users += len(users)
+
+    def flush(self, budget: int | None = None) -> int:
+        done = 0
+        pending = self.pending
+        while pending and (budget is None or done < budget):
+            item = pending[0]
+            users, amount, start = item
+            end = len(users) if budget is None else min(len(users), start + budget - done)
+            for user in users[start:end]:
+                self.add(user, amount)
+            done += end - start
+            if end == len(users):
+                pending.popleft()
+            else:
+                item[2] = end
+        self.pending_users -= done
+        return done
+
+    def _evict(self) -> float:
+        counts = self.counts
+        while True:
+            count, user = heapq.heappop(self.heap)
+            if counts.get(user) == count:
+                del counts[user]
+                del self.errors[user]
+                if user in self.top_users:
+                    self.top = [e for e in self.top if e[0] != user]
+                    self.top_users.discard(user)
+                    self.version += 1
+                return count
+
+    def _update_top(self, user: str, count: float):
+        # Credit only grows, so a user outside the top list can only enter by passing its last entry.
+        top = self.top
+        if user in self.top_users:
+            for i, (u, _) in enumerate(top):
+                if u == user:
+                    top[i] = (user, count)
+                    break
+        elif len(top) < self.k:
+            top.append((user, count))
+            self.top_users.add(user)
+        elif count > top[-1][1]:
+            self.top_users.discard(top[-1][0])
+            top[-1] = (user, count)
+            self.top_users.add(user)
+        else:
+            return
+        top.sort(key=lambda e: -e[1])
+        self.version += 1
+
+    def top_k(self, n: int | None = None) -> list[tuple[str, float]]:
+        return self.top if n is None else self.top[:n]
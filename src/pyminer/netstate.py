@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import struct
+
+import numpy as np
+
+from pyminer.sim import Simulation
+
+MSG_KEYFRAME = 0x01
+MSG_DELTA = 0x02
+
+# Every message starts with: type, tick.
+HEADER = struct.Struct("<BI")
+# Keyframes only: seed, cols, window rows, block size, screen width, screen height, BLOCK_HP, round seconds.
+ROUND = struct.Struct("<qHHHHHHf")
+# Window first row, player x/y, camera y, player vx, pickaxe radius, shake, flash, hp, flags, score, depth, remaining.
+FRAME = struct.Struct("<iffdffffbBIII")
+COUNT = struct.Struct("<H")
+# Delta cell: window row, col, kind, hp.
+CELL = np.dtype([("row", "<u2"), ("col", "<u2"), ("kind", "u1"), ("hp", "u1")])
+
+FLAG_SHIELD = 0x01
+FLAG_BOOST = 0x02
+FLAG_SLOW = 0x04
+FLAG_BIG = 0x08
+FLAG_INVULN = 0x10
+FLAG_SPONSOR_CARD = 0x20
+FLAG_ENDED = 0x40
+FLAG_GAME_OVER = 0x80
+EFFECT_FLAGS = (("shield", FLAG_SHIELD), ("boost", FLAG_BOOST), ("slow", FLAG_SLOW), ("big", FLAG_BIG))
+
+
+class StateEncoder:
+    # Keyframe:  HEADER ROUND FRAME kind[rows*cols] hp[rows*cols] text
+    # Delta:     HEADER FRAME count CELL*count count (row, kind[cols], hp[cols])*count text
+    # text is a u16 length plus JSON for the HUD; a delta sends length 0 while the HUD is unchanged.
+    def __init__(self, sim: Simulation, margin_rows: int = 2):
+        self.sim = sim
+        self.margin_rows = margin_rows
+        self.rows = sim.h // sim.block_size + 2 * margin_rows + 2
+        self.cols = sim.blocks.cols
+        shape = (self.rows, self.cols)
+        self.kind = np.zeros(shape, dtype=np.uint8)
+        self.hp = np.zeros(shape, dtype=np.uint8)
+        self.prev_kind = np.zeros(shape, dtype=np.uint8)
+        self.prev_hp = np.zeros(shape, dtype=np.uint8)
+        self.text_key: tuple | None = None
+        self.text = b""
+        self.tick = 0
+        self.first_row = self.window_row()
+        sim.blocks.window(self.first_row, self.kind, self.hp)
+        self._text_changed()
+
+    def window_row(self) -> int:
+        return int(self.sim.camera_y // self.sim.block_size) - self.margin_rows
+
+    def _frame(self) -> bytes:
+        sim = self.sim
+        now = sim.clock.now()
+        flags = 0
+        for name, flag in EFFECT_FLAGS:
+            if sim.effects.get(name, 0) > now:
+                flags |= flag
+        if now < sim.player_invuln_until:
+            flags |= FLAG_INVULN
+        if now < sim.sponsor_card_until:
+            flags |= FLAG_SPONSOR_CARD
+        if sim.round_over():
+            flags |= FLAG_ENDED
+        if sim.game_over:
+            flags |= FLAG_GAME_OVER
+        return FRAME.pack(
+            self.first_row,
+            sim.player_x,
+            sim.player_y,
+            sim.camera_y,
+            sim.player_vx,
+            sim.get_pickaxe_radius(),
+            sim.shake_power,
+            sim.hit_flash,
+            max(-128, min(127, sim.hp)),
+            flags,
+            sim.score,
+            sim.depth,
+            min(sim.remaining(), 0xFFFFFFFF),
+        )
+
+    def _text_changed(self) -> bool:
+        sim = self.sim
+        board = sim.stats.leaderboard
+        ended = sim.round_over()
+        key = (tuple(sim.recent_commands), sim.active_skill_name, board, board.version, ended)
+        if key == self.text_key:
+            return False
+        self.text_key = key
+        text = {
+            "recent": list(sim.recent_commands),
+            "skill": sim.active_skill_name,
+            "top": [[user, int(credit)] for user, credit in board.top_k(3)],
+        }
+        if ended:
+            stats = sim.stats
+            text["summary"] = sim.summary()
+            text["skills"] = dict(stats.skills)
+            text["commands"] = dict(stats.commands)
+        self.text = json.dumps(text, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return True
+
+    def keyframe(self) -> bytes:
+        sim = self.sim
+        cfg = sim.cfg
+        return b"".join(
+            (
+                HEADER.pack(MSG_KEYFRAME, self.tick),
+                ROUND.pack(sim.seed, self.cols, self.rows, sim.block_size, sim.w, sim.h, cfg.block_hp, cfg.round_seconds),
+                self._frame(),
+                self.kind.tobytes(),
+                self.hp.tobytes(),
+                COUNT.pack(len(self.text)),
+                self.text,
+            )
+        )
+
+    def delta(self) -> bytes:
+        self.tick += 1
+        self.kind, self.prev_kind = self.prev_kind, self.kind
+        self.hp, self.prev_hp = self.prev_hp, self.hp
+        prev_first = self.first_row
+        first = self.first_row = self.window_row()
+        self.sim.blocks.window(first, self.kind, self.hp)
+
+        rows = self.rows
+        lo, hi = max(first, prev_first), min(first, prev_first) + rows
+        cells = np.empty(0, dtype=CELL)
+        if lo < hi:
+            cur, old = slice(lo - first, hi - first), slice(lo - prev_first, hi - prev_first)
+            changed = (self.kind[cur] != self.prev_kind[old]) | (self.hp[cur] != self.prev_hp[old])
+            r, c = np.nonzero(changed)
+            r += lo - first
+            cells = np.empty(len(r), dtype=CELL)
+            cells["row"] = r
+            cells["col"] = c
+            cells["kind"] = self.kind[r, c]
+            cells["hp"] = self.hp[r, c]
+            fresh = [i for i in range(rows) if not lo <= first + i < hi]
+        else:
+            fresh = range(rows)
+
+        parts = [HEADER.pack(MSG_DELTA, self.tick), self._frame(), COUNT.pack(len(cells)), cells.tobytes(), COUNT.pack(len(fresh))]
+        for i in fresh:
+            parts += (COUNT.pack(i), self.kind[i].tobytes(), self.hp[i].tobytes())
+        if self._text_changed():
+            parts += (COUNT.pack(len(self.text)), self.text)
+        else:
+            parts.append(COUNT.pack(0))
+        return b"".join(parts)
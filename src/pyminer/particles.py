@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+class ParticleStore:
+    def __init__(self, capacity: int, rng: np.random.Generator | None = None, gravity: float = 420.0):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.gravity = gravity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self._arrays = (self.x, self.y, self.vx, self.vy, self.life, self.color)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def _reserve(self, count: int) -> int:
+        # Slots are kept in spawn order, so the oldest particles sit at the front.
+        count = min(count, self.capacity)
+        overflow = self.count + count - self.capacity
+        if overflow > 0:
+            keep = self.count - overflow
+            for arr in self._arrays:
+                arr[:keep] = arr[overflow:self.count]
+            self.count = keep
+        start = self.count
+        self.count += count
+        return start
+
+    def spawn(self, x: float, y: float, count: int, color: tuple[int, int, int]):
+        self.spawn_burst(np.array([x], dtype=np.float32), np.array([y], dtype=np.float32), count, color)
+
+    def spawn_burst(self, xs: np.ndarray, ys: np.ndarray, count_each: int, color: tuple[int, int, int]):
+        px = np.repeat(xs, count_each)[-self.capacity:]
+        py = np.repeat(ys, count_each)[-self.capacity:]
+        total = len(px)
+        if total == 0:
+            return
+        start = self._reserve(total)
+        end = start + total
+        ang = self.rng.uniform(0.0, math.tau, total)
+        spd = self.rng.uniform(40.0, 200.0, total)
+        self.x[start:end] = px
+        self.y[start:end] = py
+        self.vx[start:end] = np.cos(ang) * spd
+        self.vy[start:end] = np.sin(ang) * spd
+        self.life[start:end] = self.rng.uniform(0.2, 0.5, total)
+        self.color[start:end] = color
+
+    def update(self, dt: float):
+        n = self.count
+        if n == 0:
+            return
+        life = self.life[:n]
+        life -= dt
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.vy[:n] += self.gravity * dt
+        alive = life > 0
+        keep = int(np.count_nonzero(alive))
+        if keep == n:
+            return
+        for arr in self._arrays:
+            arr[:keep] = arr[:n][alive]
+        self.count = keep
+
+    def shaded_colors(self) -> np.ndarray:
+        n = self.count
+        alpha = np.maximum(30, (255 * self.life[:n] * 2).astype(np.int32))
+        return np.minimum(255, self.color[:n].astype(np.int32) * alpha[:, None] // 255)
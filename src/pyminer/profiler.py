@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+class RollingSamples:
+    def __init__(self, window: int):
+        self.values = np.zeros(window, dtype=np.int64)
+        self.index = 0
+        self.filled = 0
+
+    def add(self, value: int):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        if self.filled < len(self.values):
+            self.filled += 1
+
+    def percentiles(self) -> dict[str, float]:
+        if not self.filled:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        window = self.values[: self.filled]
+        p50, p95, p99 = np.percentile(window, (50, 95, 99)) / 1e6
+        return {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3), "max": round(window.max() / 1e6, 3)}
+
+
+class NullProfiler:
+    enabled = False
+
+    def start_frame(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def end_frame(self, **counters: int):
+        pass
+
+
+class FrameProfiler(NullProfiler):
+    enabled = True
+
+    def __init__(self, window: int = 600, export_path: Path | None = None, export_seconds: float = 5.0):
+        self.window = window
+        self.phases: dict[str, RollingSamples] = {}
+        # A frame that catches up runs several physics steps; their laps add up and count as one sample per phase.
+        self.frame_phases: dict[str, int] = {}
+        self.frame = RollingSamples(window)
+        self.counters: dict[str, int] = {}
+        self.frame_start = 0
+        self.last = 0
+        self.frames = 0
+        self.export_seconds = export_seconds
+        self.export_file = Path(export_path).open("a", encoding="utf-8") if export_path else None
+        self.last_export = time.monotonic()
+
+    def start_frame(self):
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def lap(self, phase: str):
+        now = time.perf_counter_ns()
+        self.frame_phases[phase] = self.frame_phases.get(phase, 0) + now - self.last
+        self.last = now
+
+    def end_frame(self, **counters: int):
+        self.frame.add(time.perf_counter_ns() - self.frame_start)
+        for phase, nanos in self.frame_phases.items():
+            samples = self.phases.get(phase)
+            if samples is None:
+                samples = self.phases[phase] = RollingSamples(self.window)
+            samples.add(nanos)
+        self.frame_phases.clear()
+        self.counters = counters
+        self.frames += 1
+        if self.export_file is not None and time.monotonic() - self.last_export >= self.export_seconds:
+            self.export()
+
+    def snapshot(self) -> dict:
+        return {
+            "frames": self.frames,
+            "frame_ms": self.frame.percentiles(),
+            "phases_ms": {name: s.percentiles() for name, s in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def export(self):
+        record = {"t": round(time.time(), 3), **self.snapshot()}
+        self.export_file.write(json.dumps(record) + "\n")
+        self.export_file.flush()
+        self.last_export = time.monotonic()
+
+    def close(self):
+        if self.export_file is not None:
+            self.export()
+            self.export_file.close()
+            self.export_file = None
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    particle_scale: float
+    stars: int
+    shake: bool
+    flash: bool
+    detailed_blocks: bool
+    # Booth mode only: filtered rather than nearest-neighbour downscaling of each tile.
+    smooth_scale: bool
+
+
+QUALITY_LEVELS = (
+    QualityLevel("high", 1.0, 70, True, True, True, True),
+    QualityLevel("medium", 0.6, 40, True, True, True, False),
+    QualityLevel("low", 0.35, 20, False, True, False, False),
+    QualityLevel("minimal", 0.15, 0, False, False, False, False),
+)
+
+
+class QualityGovernor:
+    def __init__(
+        self,
+        budget_seconds: float,
+        window_frames: int = 30,
+        high_water: float = 0.85,
+        low_water: float = 0.55,
+        recover_seconds: float = 3.0,
+    ):
+        self.high_water = high_water
+        self.low_water = low_water
+        self.set_budget(budget_seconds)
+        self.recover_seconds = recover_seconds
+        self.samples: deque[float] = deque(maxlen=window_frames)
+        self.total = 0.0
+        self.level = 0
+        self.calm_since: float | None = None
+        self.changes = 0
+
+    def set_budget(self, budget_seconds: float):
+        # FPS is hot-reloadable, so the watermarks follow the frame budget rather than the one at startup.
+        self.high = budget_seconds * self.high_water
+        self.low = budget_seconds * self.low_water
+
+    @property
+    def quality(self) -> QualityLevel:
+        return QUALITY_LEVELS[self.level]
+
+    def average(self) -> float:
+        return self.total / len(self.samples) if self.samples else 0.0
+
+    def update(self, frame_seconds: float, now: float) -> bool:
+        samples = self.samples
+        if len(samples) == samples.maxlen:
+            self.total -= samples[0]
+        samples.append(frame_seconds)
+        self.total += frame_seconds
+        # Each decision needs a full window measured at the current level.
+        if len(samples) < samples.maxlen:
+            return False
+
+        avg = self.total / len(samples)
+        if avg > self.high:
+            self.calm_since = None
+            if self.level < len(QUALITY_LEVELS) - 1:
+                return self._set_level(self.level + 1)
+        elif avg < self.low and self.level > 0:
+            # Stepping back up needs real headroom held for a while, so a brief lull cannot make quality flap.
+            if self.calm_since is None:
+                self.calm_since = now
+            elif now - self.calm_since >= self.recover_seconds:
+                return self._set_level(self.level - 1)
+        else:
+            self.calm_since = None
+        return False
+
+    def _set_level(self, level: int) -> bool:
+        self.level = level
+        self.samples.clear()
+        self.total = 0.0
+        self.calm_since = None
+        self.changes += 1
+        return True
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pygame
+
+BLOCK_COLORS = (
+    (0, 0, 0),
+    (90, 97, 114),
+    (125, 92, 70),
+    (58, 175, 230),
+    (175, 52, 52),
+)
+DAMAGE_STATES = 3
+
+
+def _finish(surface: pygame.Surface, alpha: bool) -> pygame.Surface:
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class RenderCache:
+    def __init__(self, w: int, h: int, block_size: int, block_max_hp: list[int]):
+        self.w = w
+        self.h = h
+        self.block_size = block_size
+        self.block_max_hp = block_max_hp
+        self.background = self._bake_background()
+        self.star_sprites = {s: self._bake_star(s) for s in (1, 2, 3)}
+        self.block_sprites = [[self._bake_block(color, state) for state in range(DAMAGE_STATES)] for color in BLOCK_COLORS]
+        self.plain_sprites = [[self._bake_block(color, state, plain=True) for state in range(DAMAGE_STATES)] for color in BLOCK_COLORS]
+        # sprite_table[kind][hp] resolves the damage state once, so drawing is two list lookups.
+        self.sprite_table = self._sprite_table(self.block_sprites)
+        # Square, opaque blocks for low quality: no rounded corners, and opaque blits skip per-pixel alpha.
+        self.plain_table = self._sprite_table(self.plain_sprites)
+
+        self.flash = _finish(pygame.Surface((w, h)), False)
+        self.flash.fill((255, 245, 230))
+        card = pygame.Surface((w - 120, 72), pygame.SRCALPHA)
+        card.fill((28, 34, 56, 220))
+        self.sponsor_card = _finish(card, True)
+        card = pygame.Surface((w - 80, 290), pygame.SRCALPHA)
+        pygame.draw.rect(card, (20, 24, 42, 232), card.get_rect(), border_radius=12)
+        self.result_card = _finish(card, True)
+
+    def _sprite_table(self, sprites: list[list[pygame.Surface]]) -> list[list[pygame.Surface]]:
+        return [
+            [sprites[kind][self._damage_state(hp, max_hp)] for hp in range(max_hp + 1)]
+            for kind, max_hp in enumerate(self.block_max_hp)
+        ]
+
+    def _bake_background(self) -> pygame.Surface:
+        surface = pygame.Surface((self.w, self.h))
+        for y in range(self.h):
+            t = y / self.h
+            c = (int(10 + 25 * t), int(14 + 30 * t), int(28 + 45 * t))
+            pygame.draw.line(surface, c, (0, y), (self.w, y))
+        return _finish(surface, False)
+
+    def _bake_star(self, s: int) -> pygame.Surface:
+        surface = pygame.Surface((s * 2 + 1, s * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (90 + s * 30, 100 + s * 20, 140 + s * 20), (s, s), s)
+        return _finish(surface, True)
+
+    def _bake_block(self, color: tuple[int, int, int], state: int, plain: bool = False) -> pygame.Surface:
+        size = self.block_size - 2
+        shade = 1.0 - 0.14 * state
+        surface = pygame.Surface((size, size), 0 if plain else pygame.SRCALPHA)
+        pygame.draw.rect(surface, tuple(int(c * shade) for c in color), (0, 0, size, size), border_radius=0 if plain else 6)
+        if state:
+            crack = tuple(int(c * 0.55) for c in color)
+            pygame.draw.line(surface, crack, (size * 0.3, size * 0.15), (size * 0.5, size * 0.55), 2)
+            if state > 1:
+                pygame.draw.line(surface, crack, (size * 0.5, size * 0.55), (size * 0.8, size * 0.75), 2)
+        return _finish(surface, not plain)
+
+    @staticmethod
+    def _damage_state(hp: int, max_hp: int) -> int:
+        if hp >= max_hp:
+            return 0
+        return min(DAMAGE_STATES - 1, 1 + (max_hp - hp - 1) * DAMAGE_STATES // max_hp)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import copy
+import json
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pyminer.config import DEFAULT_CONFIG_PATH, Config
+from pyminer.sim import COMMANDS, SPONSOR_SKILLS, Simulation
+
+MAGIC = b"PMRP"
+VERSION = 1
+
+OP_ROUND = 0x01
+OP_USER = 0x02
+OP_ENQUEUE = 0x03
+OP_POP = 0x04
+OP_SKILL = 0x05
+OP_END = 0x06
+# Hot-reloaded config keys, as JSON; applies from the next tick (or the whole round when no tick came yet).
+OP_CONFIG = 0x07
+# Tick opcodes carry move_dir + 1 in the low bits; OP_TICK_DT is followed by a new float64 dt.
+OP_TICK = 0x10
+OP_TICK_DT = 0x20
+ACCEPTED = 0x80
+
+SKILL_NAMES = tuple(name for name, _ in SPONSOR_SKILLS)
+
+
+@dataclass
+class Tick:
+    dt: float
+    move_dir: int
+    enqueues: list[tuple[str, str, bool]] = field(default_factory=list)
+    popped: tuple[str, int] | None = None
+    skill: str | None = None
+    config: dict | None = None
+
+
+@dataclass
+class RoundLog:
+    seed: int
+    ticks: list[Tick] = field(default_factory=list)
+    summary: dict | None = None
+    config: dict = field(default_factory=dict)
+
+    def duration(self) -> float:
+        return sum(t.dt for t in self.ticks)
+
+
+class ReplayRecorder:
+    def __init__(self, path: str | Path, cfg: Config):
+        self.file = Path(path).open("wb")
+        self.users: dict[str, int] = {}
+        self.sim: Simulation | None = None
+        self.last_dt: float | None = None
+        self.ended = True
+        self.base_cfg = self.cfg = cfg
+        body = json.dumps(cfg.to_dict(), sort_keys=True).encode("utf-8")
+        self.file.write(MAGIC + struct.pack("<BI", VERSION, len(body)) + body)
+
+    def begin_round(self, sim: Simulation):
+        self.end_round()
+        self.sim = sim
+        self.last_dt = None
+        self.ended = False
+        self.cfg = self.base_cfg
+        self.file.write(struct.pack("<Bq", OP_ROUND, sim.seed))
+        self.write_config(sim.cfg)
+
+    def write_config(self, cfg: Config):
+        if cfg is self.cfg:
+            return
+        changed = self.cfg.diff(cfg)
+        self.cfg = cfg
+        if changed:
+            body = json.dumps({key: getattr(cfg, key.lower()) for key in changed}).encode("utf-8")
+            self.file.write(struct.pack("<BI", OP_CONFIG, len(body)) + body)
+
+    def enqueue(self, cmd: str, user: str, accepted: bool):
+        if self.ended or cmd not in COMMANDS:
+            return
+        user_id = self.users.get(user)
+        if user_id is None:
+            user_id = self.users[user] = len(self.users)
+            # The length is a u16; cut on a character boundary rather than let an oversized name crash the loop.
+            name = user.encode("utf-8")[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+            self.file.write(struct.pack("<BIH", OP_USER, user_id, len(name)) + name)
+        self.file.write(struct.pack("<BIB", OP_ENQUEUE, user_id, COMMANDS.index(cmd) | (ACCEPTED if accepted else 0)))
+
+    def step(self, dt: float):
+        sim = self.sim
+        if self.ended:
+            sim.step(dt)
+            return
+
+        self.write_config(sim.cfg)
+        move = sim.move_dir + 1
+        if dt == self.last_dt:
+            self.file.write(bytes((OP_TICK | move,)))
+        else:
+            self.file.write(struct.pack("<Bd", OP_TICK_DT | move, dt))
+            self.last_dt = dt
+
+        popped_at, skill_at = sim.last_queue_pop, sim.last_skill
+        sim.step(dt)
+        if sim.last_queue_pop != popped_at:
+            entry = sim.last_popped
+            self.file.write(struct.pack("<BBI", OP_POP, COMMANDS.index(entry.cmd), len(entry.users)))
+        if sim.last_skill != skill_at:
+            self.file.write(struct.pack("<BB", OP_SKILL, SKILL_NAMES.index(sim.active_skill_name)))
+        if sim.round_over():
+            self.end_round()
+
+    def end_round(self):
+        if self.ended:
+            return
+        body = json.dumps(self.sim.summary()).encode("utf-8")
+        self.file.write(struct.pack("<BI", OP_END, len(body)) + body)
+        self.file.flush()
+        self.ended = True
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.end_round()
+        self.file.close()
+
+
+def load_replay(path: str | Path) -> tuple[Config, list[RoundLog]]:
+    data = Path(path).read_bytes()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a pyminer replay")
+    version, cfg_len = struct.unpack_from("<BI", data, 4)
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported replay version {version}")
+    pos = 9 + cfg_len
+    # Keys added after the recording was made fall back to today's defaults.
+    defaults = json.loads(DEFAULT_CONFIG_PATH.read_text(encoding="utf-8"))
+    cfg = Config({**defaults, **json.loads(data[9:pos])}, Path(path).name)
+
+    rounds: list[RoundLog] = []
+    users: dict[int, str] = {}
+    current: RoundLog | None = None
+    enqueues: list[tuple[str, str, bool]] = []
+    config: dict | None = None
+    dt = 0.0
+    end = len(data)
+    try:
+        while pos < end:
+            op = data[pos]
+            pos += 1
+            if op == OP_ROUND:
+                (seed,) = struct.unpack_from("<q", data, pos)
+                pos += 8
+                current = RoundLog(seed)
+                rounds.append(current)
+                enqueues = []
+            elif op == OP_USER:
+                user_id, size = struct.unpack_from("<IH", data, pos)
+                pos += 6
+                users[user_id] = data[pos : pos + size].decode("utf-8")
+                pos += size
+            elif op == OP_ENQUEUE:
+                user_id, packed = struct.unpack_from("<IB", data, pos)
+                pos += 5
+                enqueues.append((users[user_id], COMMANDS[packed & ~ACCEPTED], bool(packed & ACCEPTED)))
+            elif op & 0xF0 in (OP_TICK, OP_TICK_DT):
+                if op & 0xF0 == OP_TICK_DT:
+                    (dt,) = struct.unpack_from("<d", data, pos)
+                    pos += 8
+                current.ticks.append(Tick(dt, (op & 0x0F) - 1, enqueues, config=config))
+                enqueues = []
+                config = None
+            elif op == OP_POP:
+                cmd, users_count = struct.unpack_from("<BI", data, pos)
+                pos += 5
+                current.ticks[-1].popped = (COMMANDS[cmd], users_count)
+            elif op == OP_SKILL:
+                current.ticks[-1].skill = SKILL_NAMES[data[pos]]
+                pos += 1
+            elif op == OP_CONFIG:
+                (size,) = struct.unpack_from("<I", data, pos)
+                pos += 4
+                if pos + size > end:
+                    break
+                overrides = json.loads(data[pos : pos + size])
+                pos += size
+                if current.ticks:
+                    config = {**(config or {}), **overrides}
+                else:
+                    current.config.update(overrides)
+            elif op == OP_END:
+                (size,) = struct.unpack_from("<I", data, pos)
+                pos += 4
+                if pos + size > end:
+                    break
+                current.summary = json.loads(data[pos : pos + size])
+                pos += size
+            else:
+                raise ValueError(f"{path}: unknown replay opcode 0x{op:02x} at byte {pos - 1}")
+    except (struct.error, IndexError):
+        # A recording cut off by a crash still replays up to its last complete tick.
+        pass
+    return cfg, [r for r in rounds if r.ticks]
+
+
+class ReplayPlayer:
+    def __init__(self, cfg: Config, log: RoundLog, snapshot_seconds: float = 5.0, background: bool = False):
+        self.cfg = cfg.with_overrides(log.config) if log.config else cfg
+        self.log = log
+        self.snapshot_seconds = snapshot_seconds
+        self.sim = Simulation(self.cfg, log.seed, background=background)
+        self.tick = 0
+        self.target = 0.0
+        self.speed = 1.0
+        self.paused = False
+        self.mismatches: dict[int, str] = {}
+        self.snapshots: list[tuple[int, float, Simulation]] = []
+        self.take_snapshot()
+
+    def done(self) -> bool:
+        return self.tick >= len(self.log.ticks)
+
+    def clone(self, sim: Simulation) -> Simulation:
+        # Terrain generator, profiler and event subscribers live outside the round and stay shared; Config is immutable.
+        memo = {id(x): x for x in (sim.terrain, sim.profiler, sim.events)}
+        return copy.deepcopy(sim, memo)
+
+    def take_snapshot(self):
+        if self.snapshots and self.snapshots[-1][0] >= self.tick:
+            return
+        self.snapshots.append((self.tick, self.sim.elapsed(), self.clone(self.sim)))
+
+    def step(self) -> bool:
+        if self.done():
+            return False
+        tick = self.log.ticks[self.tick]
+        sim = self.sim
+        for user, cmd, accepted in tick.enqueues:
+            if sim.enqueue_command(cmd, user) != accepted:
+                self.mismatches.setdefault(self.tick, f"enqueue {cmd} by {user} accepted={not accepted}")
+        sim.move_dir = tick.move_dir
+        if tick.config:
+            sim.cfg = sim.cfg.with_overrides(tick.config)
+
+        popped_at, skill_at = sim.last_queue_pop, sim.last_skill
+        sim.step(tick.dt)
+        popped = (sim.last_popped.cmd, len(sim.last_popped.users)) if sim.last_queue_pop != popped_at else None
+        skill = sim.active_skill_name if sim.last_skill != skill_at else None
+        if popped != tick.popped:
+            self.mismatches.setdefault(self.tick, f"popped {popped}, recorded {tick.popped}")
+        elif skill != tick.skill:
+            self.mismatches.setdefault(self.tick, f"skill {skill}, recorded {tick.skill}")
+
+        self.tick += 1
+        if sim.elapsed() >= self.snapshots[-1][1] + self.snapshot_seconds:
+            self.take_snapshot()
+        return True
+
+    def seek(self, seconds: float):
+        seconds = max(0.0, seconds)
+        tick, _, snap = next(s for s in reversed(self.snapshots) if s[1] <= seconds)
+        if seconds < self.sim.elapsed() or tick > self.tick:
+            profiler = self.sim.profiler
+            self.sim = self.clone(snap)
+            self.sim.profiler = profiler
+            self.tick = tick
+        while not self.done() and self.sim.elapsed() < seconds:
+            self.step()
+        self.target = min(seconds, self.sim.elapsed())
+
+    def advance(self, wall_dt: float):
+        if self.paused or self.done():
+            return
+        self.target += wall_dt * self.speed
+        while not self.done() and self.sim.elapsed() < self.target:
+            self.step()
+
+    def report(self) -> dict:
+        summary = self.sim.summary()
+        diverged = bool(self.mismatches) or (self.done() and self.log.summary not in (None, summary))
+        return {
+            **summary,
+            "tick": self.tick,
+            "ticks": len(self.log.ticks),
+            "diverged": diverged,
+            "mismatches": [f"tick {t}: {msg}" for t, msg in sorted(self.mismatches.items())[:10]],
+        }
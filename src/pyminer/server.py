@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import time
+
+from pyminer.chat import ChatIngest
+from pyminer.config import ROOT, Config
+from pyminer.events import EventBus, EventLogWriter
+from pyminer.netstate import StateEncoder
+from pyminer.sim import Simulation
+from pyminer.spectate import SpectatorHub, SpectatorServer
+
+WEB_ROOT = ROOT / "web"
+
+
+class GameServer:
+    # Runs rounds headless in real time and streams them to spectators; the simulation thread
+    # only encodes and hands bytes to the hub, so spectator count never touches the tick.
+    def __init__(self, cfg: Config, seed: int | None = None, chat: ChatIngest | None = None, event_log: EventLogWriter | None = None):
+        self.cfg = cfg
+        self.seed = seed
+        self.chat = chat
+        self.event_log = event_log
+        self.events = EventBus()
+        if event_log is not None:
+            self.events.subscribe(event_log.publish)
+        self.hub = SpectatorHub(cfg.spectator_client_queue)
+        self.server = SpectatorServer((cfg.spectator_host, cfg.spectator_port), self.hub, WEB_ROOT)
+        self.late_ticks = 0
+
+    def run(self, rounds: int | None = None):
+        self.hub.start()
+        self.server.start()
+        host, port = self.server.server_address[:2]
+        print(f"spectators: http://{host}:{port}/", flush=True)
+        played = 0
+        try:
+            while rounds is None or played < rounds:
+                seed = None if self.seed is None else self.seed + played
+                sim = Simulation(self.cfg, seed, background=True, events=self.events)
+                try:
+                    self.run_round(sim)
+                finally:
+                    sim.close()
+                played += 1
+                print(json.dumps({**sim.summary(), "spectators": len(self.hub.spectators)}), flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.stop()
+            self.hub.stop()
+            if self.chat is not None:
+                self.chat.stop()
+            if self.event_log is not None:
+                self.event_log.stop()
+
+    def run_round(self, sim: Simulation):
+        cfg = self.cfg
+        step_dt = cfg.physics_dt
+        keyframe_ticks = max(1, round(cfg.spectator_keyframe_seconds / step_dt))
+        encoder = StateEncoder(sim)
+        hub = self.hub
+        hub.publish(None, encoder.keyframe())
+
+        ended_at = None
+        next_tick = time.perf_counter()
+        while ended_at is None or sim.elapsed() - ended_at < cfg.spectator_result_seconds:
+            if self.chat is not None:
+                for user, cmd in self.chat.drain():
+                    sim.enqueue_command(cmd, user)
+            sim.step(step_dt)
+            delta = encoder.delta()
+            keyframe = encoder.tick % keyframe_ticks == 0 or hub.keyframe_wanted
+            hub.publish(delta, encoder.keyframe() if keyframe else None)
+            if ended_at is None and sim.round_over():
+                ended_at = sim.elapsed()
+
+            next_tick += step_dt
+            sim.terrain.build_ahead(next_tick - step_dt * 0.25)
+            wait = next_tick - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            elif wait < -cfg.max_steps_per_frame * step_dt:
+                # Too far behind to catch up: drop the backlog rather than fast-forwarding spectators.
+                next_tick = time.perf_counter()
+                self.late_ticks += 1
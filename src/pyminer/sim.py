@@ -0,0 +1,553 @@
+from __future__ import annotations
+
+import math
+import random
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from pyminer.config import Config
+from pyminer.events import EventBus, RoundStats
+from pyminer.leaderboard import Leaderboard
+from pyminer.particles import ParticleStore
+from pyminer.profiler import NullProfiler
+from pyminer.terrain import TerrainGenerator
+from pyminer.world import EMPTY, HAZARD, KIND_GAIN, KIND_NAMES, BlockGrid
+
+COMMANDS = ("tnt", "boost", "slow", "big", "shield")
+SPONSOR_SKILLS = (
+    ("Cloud AutoScale", "boost"),
+    ("Security ShieldWall", "shield"),
+    ("AI SmartPath", "big"),
+)
+
+
+@dataclass
+class QueuedCommand:
+    cmd: str
+    users: list[str] = field(default_factory=list)
+    credit: float = 0.0
+    # Same names as users, for the membership check when coalescing into a long-waiting entry.
+    members: set[str] = field(default_factory=set)
+
+
+class SimClock:
+    def __init__(self, start: float = 0.0):
+        self.t = start
+
+    def now(self) -> float:
+        return self.t
+
+    def advance(self, dt: float):
+        self.t += dt
+
+
+class Simulation:
+    def __init__(
+        self,
+        cfg: Config,
+        seed: int | None = None,
+        clock: SimClock | None = None,
+        background: bool = False,
+        events: EventBus | None = None,
+        terrain: TerrainGenerator | None = None,
+        recycle: Simulation | None = None,
+        instance: int = 0,
+    ):
+        self.cfg = cfg
+        # Which game in the process this is (booth mode); tagged on every event so a shared log can be split.
+        self.instance = instance
+        self.w = cfg.window_width
+        self.h = cfg.window_height
+        self.block_size = cfg.block_size
+        if terrain is not None:
+            seed = terrain.seed
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.clock = clock if clock is not None else SimClock()
+        self.profiler = NullProfiler()
+        self.events = events if events is not None else EventBus()
+        self.stats = RoundStats(
+            Leaderboard(cfg.leaderboard_size, cfg.leaderboard_capacity, cfg.leaderboard_sketch_width, cfg.leaderboard_sketch_depth)
+        )
+        # Commands whose effect is running; score earned meanwhile is credited to their users.
+        self.effect_owners: dict[str, QueuedCommand] = {}
+        self.ended = False
+
+        self.player_x = self.w // 2
+        self.player_y = int(self.h * 0.42)
+        self.player_vx = 0.0
+        self.player_vy = float(cfg.player_start_fall_speed)
+        self.move_dir = 0
+
+        self.camera_y = 0.0
+        self.score = 0
+        self.depth = 0
+        self.hp = 5
+        self.game_over = False
+
+        self.speed_mul = 1.0
+        self.size_mul = 1.0
+        self.shield = False
+        self.effects: dict[str, float] = {}
+
+        # A restarted round takes over the previous round's chunk and particle buffers instead of allocating new ones.
+        old_blocks = recycle.blocks if recycle is not None else None
+        if old_blocks is not None and (old_blocks.cols, old_blocks.block_size, old_blocks.chunk_rows) == (cfg.cols, self.block_size, cfg.chunk_rows):
+            old_blocks.reset()
+            self.blocks = old_blocks
+        else:
+            self.blocks = BlockGrid(cfg.cols, self.block_size, cfg.chunk_rows)
+        old_particles = recycle.particles if recycle is not None else None
+        if old_particles is not None and old_particles.capacity == cfg.max_particles:
+            old_particles.clear()
+            old_particles.rng = np.random.default_rng(self.seed)
+            self.particles = old_particles
+        else:
+            self.particles = ParticleStore(cfg.max_particles, np.random.default_rng(self.seed))
+        # Particles are cosmetic; the game's quality governor scales how many each effect spawns.
+        self.particle_scale = recycle.particle_scale if recycle is not None else 1.0
+
+        self.terrain = terrain if terrain is not None else self.make_terrain(cfg, self.seed, background)
+        self.last_generated_row = -1
+        self.generate_rows(0, cfg.spawn_rows_ahead)
+
+        self.command_queue: deque[QueuedCommand] = deque()
+        self.pending_commands: dict[str, QueuedCommand] = {}
+        self.user_last_command: OrderedDict[str, float] = OrderedDict()
+        self.recent_commands: list[str] = []
+        self.last_popped: QueuedCommand | None = None
+        self.last_queue_pop = -math.inf
+        self.last_skill = -math.inf
+        self.active_skill_name = "-"
+        self.sponsor_card_until = 0.0
+
+        self.shake_power = 0.0
+        self.hit_flash = 0.0
+        self.hit_stop_until = 0.0
+        self.player_invuln_until = 0.0
+
+        self.start_at = self.clock.now()
+        self.emit("round_start", round_seconds=cfg.round_seconds)
+
+    @staticmethod
+    def make_terrain(cfg: Config, seed: int, background: bool = False) -> TerrainGenerator:
+        return TerrainGenerator(
+            seed,
+            cfg.chunk_rows,
+            cfg.cols,
+            cfg.block_hp,
+            cfg.top_clear_rows,
+            cfg.terrain_prefetch_chunks if background else 0,
+        )
+
+    @classmethod
+    def prewarm(cls, cfg: Config, seed: int | None = None) -> TerrainGenerator:
+        # Queues the opening rows of a future round for idle-time building; pass the result as terrain=.
+        terrain = cls.make_terrain(cfg, seed if seed is not None else random.randrange(2**32), background=True)
+        terrain.warm(-(-cfg.spawn_rows_ahead // cfg.chunk_rows))
+        return terrain
+
+    def get_pickaxe_radius(self) -> float:
+        return self.cfg.pickaxe_base_radius * self.size_mul
+
+    def emit(self, event_type: str, **fields):
+        event = {"type": event_type, "instance": self.instance, "seed": self.seed, "t": round(self.elapsed(), 3), **fields}
+        self.stats.add(event)
+        self.events.publish(event)
+
+    def credit(self, users: list[str], amount: float, each: bool = False):
+        users = [u for u in users if u != "auto"]
+        if not users or amount <= 0:
+            return
+        self.stats.leaderboard.add_many(users, amount if each else amount / len(users))
+
+    def credit_effects(self, amount: float):
+        owners = self.effect_owners
+        if owners:
+            share = amount / len(owners)
+            for entry in owners.values():
+                entry.credit += share
+
+    def settle_effect(self, effect: str):
+        # Effect credit is handed out once per command, not per block hit, so a command
+        # coalesced from thousands of viewers does not cost thousands of updates every hit.
+        entry = self.effect_owners.pop(effect, None)
+        if entry is not None:
+            self.credit(entry.users, entry.credit)
+
+    def generate_rows(self, start_row: int, row_count: int):
+        chunk_rows = self.blocks.chunk_rows
+        last_row = start_row + row_count - 1
+        while self.last_generated_row < last_row:
+            index = (self.last_generated_row + 1) // chunk_rows
+            data = self.terrain.take(index)
+            self.blocks.install(data.first_row, data.kind, data.hp)
+            self.last_generated_row = (index + 1) * chunk_rows - 1
+
+    def enqueue_command(self, cmd: str, user: str = "local") -> bool:
+        if cmd not in COMMANDS:
+            return False
+        now = self.clock.now()
+        cooldown = self.cfg.command_cooldown_seconds
+        seen = self.user_last_command
+        last = seen.get(user)
+        if last is not None and now - last < cooldown:
+            return False
+        seen[user] = now
+        seen.move_to_end(user)
+        while seen:
+            oldest_user, at = next(iter(seen.items()))
+            if now - at < cooldown:
+                break
+            del seen[oldest_user]
+
+        pending = self.pending_commands.get(cmd)
+        if pending is not None:
+            # A user whose cooldown ran out while the entry still waits is already in it; count them once.
+            if user not in pending.members:
+                pending.members.add(user)
+                pending.users.append(user)
+            return True
+        entry = QueuedCommand(cmd, [user], members={user})
+        self.command_queue.append(entry)
+        self.pending_commands[cmd] = entry
+        return True
+
+    def pop_command(self):
+        now = self.clock.now()
+        if now - self.last_queue_pop < self.cfg.queue_pop_interval_seconds or not self.command_queue:
+            return
+
+        entry = self.command_queue.popleft()
+        del self.pending_commands[entry.cmd]
+        cmd = entry.cmd
+        self.last_popped = entry
+        self.recent_commands = ([cmd] + self.recent_commands)[:4]
+        self.last_queue_pop = now
+        self.emit("command", cmd=cmd, users=entry.users)
+        self.credit(entry.users, self.cfg.leaderboard_command_credit, each=True)
+        if cmd == "tnt":
+            self.trigger_tnt(entry.users)
+            return
+        self.effects[cmd] = now + self.cfg.effect_seconds[cmd]
+        self.settle_effect(cmd)
+        self.effect_owners[cmd] = entry
+
+    def trigger_tnt(self, users: list[str] = ()):
+        cx, cy = self.player_x, self.player_y + self.camera_y
+        radius = self.cfg.tnt_radius
+        bs = self.block_size
+        half = bs / 2
+        grid = self.blocks
+        c0, c1, r0, r1 = grid.cell_range(cx - radius - half, cy - radius - half, cx + radius - half, cy + radius - half)
+        xs: list[np.ndarray] = []
+        ys: list[np.ndarray] = []
+        kinds: list[np.ndarray] = []
+        for chunk, lo, hi in grid.chunks_in_rows(r0, r1):
+            bx = np.arange(c0, c1 + 1) * bs + half
+            by = np.arange(chunk.first_row + lo, chunk.first_row + hi) * bs + half
+            kind = chunk.kind[lo:hi, c0 : c1 + 1]
+            hit = (kind != EMPTY) & ((bx[None, :] - cx) ** 2 + (by[:, None] - cy) ** 2 <= radius * radius)
+            n = int(np.count_nonzero(hit))
+            if not n:
+                continue
+            rr, cc = np.nonzero(hit)
+            xs.append(bx[cc])
+            ys.append(by[rr])
+            kinds.append(kind[hit])
+            kind[hit] = EMPTY
+            chunk.hp[lo:hi, c0 : c1 + 1][hit] = 0
+            chunk.count -= n
+            grid.count -= n
+        removed = sum(len(x) for x in xs)
+        if removed:
+            self.particles.spawn_burst(np.concatenate(xs), np.concatenate(ys), self.particle_count(6), (255, 170, 80))
+        self.score += removed * 12
+        self.credit(users, removed * 12)
+        by_kind = np.bincount(np.concatenate(kinds), minlength=len(KIND_NAMES)) if removed else ()
+        self.emit("tnt", blocks={KIND_NAMES[k]: int(n) for k, n in enumerate(by_kind) if n}, gain=removed * 12)
+        self.shake_power = max(self.shake_power, 10)
+
+    def apply_sponsor_skill(self):
+        now = self.clock.now()
+        if now - self.last_skill < self.cfg.sponsor_skill_interval_seconds:
+            return
+
+        name, effect = self.rng.choice(SPONSOR_SKILLS)
+        self.settle_effect(effect)
+        self.active_skill_name = name
+        self.effects[effect] = now + 5
+        self.last_skill = now
+        self.sponsor_card_until = now + 1.6
+        self.emit("skill", name=name, effect=effect)
+
+    def update_effects(self):
+        now = self.clock.now()
+        self.speed_mul = 1.0
+        self.size_mul = 1.0
+        self.shield = False
+        if self.effects.get("boost", 0) > now:
+            self.speed_mul *= 1.45
+        if self.effects.get("slow", 0) > now:
+            self.speed_mul *= 0.68
+        if self.effects.get("big", 0) > now:
+            self.size_mul = 1.7
+        if self.effects.get("shield", 0) > now:
+            self.shield = True
+        for effect in [e for e in self.effect_owners if self.effects.get(e, 0) <= now]:
+            self.settle_effect(effect)
+
+    def particle_count(self, count: int) -> int:
+        return int(count * self.particle_scale + 0.5)
+
+    def spawn_particles(self, x: float, y: float, count: int, color: tuple[int, int, int]):
+        count = self.particle_count(count)
+        if count:
+            self.particles.spawn(x, y, count, color)
+
+    def resolve_circle_rect(self, cx: float, cy: float, r: float, left: float, top: float, right: float, bottom: float) -> tuple[float, float, float, float] | None:
+        nearest_x = max(left, min(cx, right))
+        nearest_y = max(top, min(cy, bottom))
+        dx = cx - nearest_x
+        dy = cy - nearest_y
+        dist_sq = dx * dx + dy * dy
+
+        if dist_sq > r * r:
+            return None
+
+        if dist_sq > 1e-6:
+            dist = math.sqrt(dist_sq)
+            nx = dx / dist
+            ny = dy / dist
+            penetration = r - dist
+            return nx, ny, penetration, max(0.0, -self.player_vx * nx - self.player_vy * ny)
+
+        left_pen = cx - left
+        right_pen = right - cx
+        top_pen = cy - top
+        bot_pen = bottom - cy
+        pen = min(left_pen, right_pen, top_pen, bot_pen)
+        if pen == left_pen:
+            return -1.0, 0.0, r + pen, max(0.0, self.player_vx)
+        if pen == right_pen:
+            return 1.0, 0.0, r + pen, max(0.0, -self.player_vx)
+        if pen == top_pen:
+            return 0.0, -1.0, r + pen, max(0.0, self.player_vy)
+        return 0.0, 1.0, r + pen, max(0.0, -self.player_vy)
+
+    def handle_collisions(self):
+        cfg = self.cfg
+        world_py = self.player_y + self.camera_y
+        pr = self.get_pickaxe_radius()
+        now = self.clock.now()
+        bs = self.block_size
+        half = bs / 2
+        grid = self.blocks
+        # One cell of margin covers blocks the pickaxe is pushed into while resolving.
+        reach = pr + bs
+        c0, c1, r0, r1 = grid.cell_range(self.player_x - reach, world_py - reach, self.player_x + reach, world_py + reach)
+
+        for row in range(r0, r1 + 1):
+            chunk = grid.chunk_at(row)
+            if chunk is None or not chunk.count:
+                continue
+            lr = row - chunk.first_row
+            kinds = chunk.kind
+            top = row * bs
+            for col in range(c0, c1 + 1):
+                kind = kinds.item(lr, col)
+                if kind == EMPTY:
+                    continue
+                left = col * bs
+                hit = self.resolve_circle_rect(self.player_x, world_py, pr, left, top, left + bs, top + bs)
+                if not hit:
+                    continue
+
+                nx, ny, penetration, impact = hit
+                self.player_x += nx * penetration
+                world_py += ny * penetration
+                self.player_x = max(pr, min(self.w - pr, self.player_x))
+
+                vn = self.player_vx * nx + self.player_vy * ny
+                if vn < 0:
+                    restitution = cfg.restitution_by_kind[kind]
+                    self.player_vx -= (1.0 + restitution) * vn * nx
+                    self.player_vy -= (1.0 + restitution) * vn * ny
+
+                    tangent_x, tangent_y = -ny, nx
+                    vt = self.player_vx * tangent_x + self.player_vy * tangent_y
+                    self.player_vx -= vt * (1.0 - cfg.wall_friction) * tangent_x
+                    self.player_vy -= vt * (1.0 - cfg.wall_friction) * tangent_y
+
+                if kind == HAZARD:
+                    if self.shield:
+                        self.effects["shield"] = 0
+                        grid.clear(chunk, lr, col)
+                        self.emit("block_break", kind=KIND_NAMES[kind], col=col, row=row, by="shield")
+                        self.spawn_particles(left + half, top + half, 12, (100, 220, 255))
+                        self.shake_power = max(self.shake_power, 8)
+                        self.hit_flash = max(self.hit_flash, 0.12)
+                        continue
+
+                    if now >= self.player_invuln_until:
+                        self.hp -= 1
+                        self.player_invuln_until = now + cfg.hazard_invuln_seconds
+                        self.player_vx += nx * 180
+                        self.player_vy += ny * 220
+                        self.shake_power = max(self.shake_power, 10)
+                        self.hit_flash = max(self.hit_flash, 0.2)
+                        self.spawn_particles(left + half, top + half, 16, (255, 90, 90))
+                        if self.hp <= 0:
+                            self.game_over = True
+                    continue
+
+                hp = chunk.hp.item(lr, col)
+                if now - chunk.hit_at.item(lr, col) > cfg.block_contact_cooldown_seconds:
+                    bonus = 0
+                    if impact > 170:
+                        bonus += 1
+                    if impact > 280:
+                        bonus += 1
+                    hp = max(0, hp - 1 - bonus)
+                    chunk.hp[lr, col] = hp
+                    chunk.hit_at[lr, col] = now
+                    gain = KIND_GAIN[kind] + bonus * 2
+                    self.score += gain
+                    self.credit_effects(gain)
+                    self.spawn_particles(left + half, top + half, 6 + bonus * 3, (180, 180, 200))
+                    self.shake_power = max(self.shake_power, min(9, 2 + impact * 0.015))
+                    self.hit_flash = max(self.hit_flash, min(0.14, 0.04 + impact * 0.00018))
+                    self.hit_stop_until = max(self.hit_stop_until, now + min(cfg.impact_hitstop_max_seconds, 0.01 + impact * 0.00003))
+
+                if hp <= 0:
+                    grid.clear(chunk, lr, col)
+                    self.emit("block_break", kind=KIND_NAMES[kind], col=col, row=row, by="pickaxe")
+                    self.spawn_particles(left + half, top + half, 12, (245, 235, 190))
+                    self.player_vy *= 0.96
+                    self.shake_power = max(self.shake_power, 6)
+                    self.hit_flash = max(self.hit_flash, 0.12)
+
+        self.camera_y = world_py - self.player_y
+
+    def update_particles(self, dt: float):
+        self.particles.update(dt)
+
+    def collision_substeps(self, dt: float) -> int:
+        # Swept broadphase: split the step only when the pickaxe travels more than half its radius
+        # and the cells along the way hold something it could tunnel through.
+        cfg = self.cfg
+        pr = self.get_pickaxe_radius()
+        dx = max(abs(self.player_vx), abs(self.move_dir) * cfg.player_base_speed * self.speed_mul) * dt
+        dy = (self.player_vy + cfg.gravity_accel * dt) * self.speed_mul * cfg.auto_fall_mul * dt
+        travel = max(dx, abs(dy))
+        limit = pr * 0.5
+        if travel <= limit:
+            return 1
+        world_py = self.player_y + self.camera_y
+        reach = pr + self.block_size
+        c0, c1, r0, r1 = self.blocks.cell_range(
+            self.player_x - dx - reach,
+            world_py + min(0.0, dy) - reach,
+            self.player_x + dx + reach,
+            world_py + max(0.0, dy) + reach,
+        )
+        if not self.blocks.any_solid(c0, c1, r0, r1):
+            return 1
+        return min(cfg.collision_substeps_max, math.ceil(travel / limit))
+
+    def update_world(self, dt: float):
+        cfg = self.cfg
+        target_vx = self.move_dir * cfg.player_base_speed * self.speed_mul
+        blend = min(1.0, cfg.air_control * dt)
+        self.player_vx += (target_vx - self.player_vx) * blend
+
+        self.player_vy += cfg.gravity_accel * dt
+        self.player_vy = min(cfg.fall_speed_cap, self.player_vy)
+
+        self.player_x += self.player_vx * dt
+        pr = self.get_pickaxe_radius()
+        self.player_x = max(pr, min(self.w - pr, self.player_x))
+
+        self.camera_y += self.player_vy * dt * self.speed_mul * cfg.auto_fall_mul
+        self.depth = max(0, int(self.camera_y / self.block_size))
+
+        target_last = int((self.camera_y + self.h * 2) / self.block_size)
+        if target_last > self.last_generated_row:
+            self.generate_rows(self.last_generated_row + 1, target_last - self.last_generated_row)
+        self.blocks.evict_above(int(self.camera_y // self.block_size) - cfg.evict_margin_rows)
+
+    def close(self):
+        self.terrain.close()
+
+    def elapsed(self) -> float:
+        return self.clock.now() - self.start_at
+
+    def remaining(self) -> int:
+        return max(0, int(self.cfg.round_seconds - self.elapsed()))
+
+    def round_over(self) -> bool:
+        return self.game_over or self.elapsed() >= self.cfg.round_seconds
+
+    def step(self, dt: float):
+        if self.cfg.auto_mode and self.rng.random() < 0.018:
+            self.enqueue_command(self.rng.choice(COMMANDS), "auto")
+
+        self.clock.advance(dt)
+        now = self.clock.now()
+        prof = self.profiler
+        if not self.round_over():
+            self.pop_command()
+            prof.lap("pop_command")
+            self.apply_sponsor_skill()
+            prof.lap("apply_sponsor_skill")
+            self.update_effects()
+            prof.lap("update_effects")
+
+            if now >= self.hit_stop_until:
+                substeps = self.collision_substeps(dt)
+                sub_dt = dt / substeps
+                for _ in range(substeps - 1):
+                    self.update_world(sub_dt)
+                    prof.lap("update_world")
+                    self.handle_collisions()
+                    prof.lap("handle_collisions")
+                    if now < self.hit_stop_until:
+                        break
+                else:
+                    self.update_world(sub_dt)
+            prof.lap("update_world")
+            self.handle_collisions()
+            prof.lap("handle_collisions")
+            self.update_particles(dt)
+            prof.lap("update_particles")
+            self.stats.leaderboard.flush(self.cfg.leaderboard_credits_per_step)
+            prof.lap("leaderboard")
+
+        decay = 0.85 ** (dt * 60)
+        self.shake_power *= decay
+        self.hit_flash = max(0.0, self.hit_flash * decay)
+        if not self.ended and self.round_over():
+            self.ended = True
+            for effect in list(self.effect_owners):
+                self.settle_effect(effect)
+            self.stats.leaderboard.flush()
+            self.emit("round_end", **self.summary())
+
+    def summary(self) -> dict:
+        return {
+            "seed": self.seed,
+            "score": self.score,
+            "depth": self.depth,
+            "hp": self.hp,
+            "game_over": self.game_over,
+            "seconds": round(min(self.elapsed(), self.cfg.round_seconds), 3),
+        }
+
+    def run_round(self, dt: float | None = None, max_seconds: float | None = None) -> dict:
+        dt = dt if dt is not None else self.cfg.physics_dt
+        limit = max_seconds if max_seconds is not None else self.cfg.round_seconds
+        while not self.round_over() and self.elapsed() < limit:
+            self.step(dt)
+        return self.summary()
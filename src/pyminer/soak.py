@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import fnmatch
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from pyminer.config import Config
+from pyminer.profiler import RollingSamples
+from pyminer.sim import Simulation
+
+SOAK_OVERRIDES = {"AUTO_MODE": True, "PROFILE_EXPORT_PATH": None}
+RESULT_SCREEN_SECONDS = 3.0
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No procfs (macOS): peak RSS is the best available, in bytes there and KiB elsewhere.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def slope_per_hour(times: list[float], values: list[float]) -> float:
+    if len(times) < 3 or times[-1] - times[0] <= 0:
+        return 0.0
+    return float(np.polyfit(times, values, 1)[0]) * 3600
+
+
+class SoakMonitor:
+    # Samples memory, GC and frame time every `interval` seconds; allocation growth is measured
+    # against the first tracemalloc snapshot taken after the warm-up, so one-off caches filling up don't count.
+    def __init__(self, out, interval: float, warmup: float, top: int = 15, trace_frames: int = 1):
+        self.out = out
+        self.interval = interval
+        self.warmup = warmup
+        self.top = top
+        self.started = time.perf_counter()
+        self.next_sample = self.started + interval
+        self.frames = RollingSamples(1 << 16)
+        self.samples: list[dict] = []
+        self.base_snapshot: tracemalloc.Snapshot | None = None
+        self.growth: list[dict] = []
+        tracemalloc.start(trace_frames)
+
+    def frame(self, nanos: int):
+        self.frames.add(nanos)
+
+    def due(self) -> bool:
+        return time.perf_counter() >= self.next_sample
+
+    def sample(self, rounds: int, frames: int, **counters: int) -> dict:
+        now = time.perf_counter()
+        self.next_sample = now + self.interval
+        elapsed = now - self.started
+        growth = None
+        if elapsed >= self.warmup:
+            # Snapshot first so RSS is read after the comparison's own allocations have come and gone.
+            snapshot = self.snapshot()
+            if self.base_snapshot is None:
+                self.base_snapshot = snapshot
+            else:
+                growth = self.growth = self.top_growth(snapshot)
+            del snapshot
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        sample = {
+            "t": round(elapsed, 1),
+            "rounds": rounds,
+            "frames": frames,
+            # tracemalloc's own bookkeeping lives in the process too; leave it out of the trend.
+            "rss_mb": round((rss_bytes() - tracemalloc.get_tracemalloc_memory()) / 2**20, 2),
+            "tracemalloc_mb": round(tracemalloc.get_tracemalloc_memory() / 2**20, 2),
+            "traced_mb": round(traced / 2**20, 2),
+            "traced_peak_mb": round(traced_peak / 2**20, 2),
+            "gc_counts": gc.get_count(),
+            "gc_collections": [s["collections"] for s in gc.get_stats()],
+            "gc_objects": len(gc.get_objects()),
+            "frame_ms": self.frames.percentiles(),
+            **counters,
+        }
+        self.frames.index = self.frames.filled = 0
+        # Holding the baseline snapshot costs RSS itself, so the trend starts at the sample after it.
+        if growth is not None:
+            sample["top_growth"] = growth[:3]
+            self.samples.append(sample)
+        self.out.write(json.dumps({"sample": sample}) + "\n")
+        self.out.flush()
+        return sample
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, fnmatch.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def top_growth(self, snapshot: tracemalloc.Snapshot) -> list[dict]:
+        stats = snapshot.compare_to(self.base_snapshot, "traceback" if tracemalloc.get_traceback_limit() > 1 else "lineno")
+        stats = [s for s in stats if s.size_diff > 0]
+        stats.sort(key=lambda s: s.size_diff, reverse=True)
+        return [
+            {
+                "site": " <- ".join(f"{f.filename}:{f.lineno}" for f in s.traceback),
+                "size_diff_kb": round(s.size_diff / 1024, 1),
+                "count_diff": s.count_diff,
+                "size_kb": round(s.size / 1024, 1),
+            }
+            for s in stats[: self.top]
+        ]
+
+    def report(self, max_rss_growth_mb: float, max_rss_slope_mb: float, max_frame_drift: float) -> dict:
+        samples = self.samples
+        failures = []
+        summary: dict = {"samples": len(samples), "failures": failures}
+        if len(samples) >= 2:
+            first, last = samples[0], samples[-1]
+            times = [s["t"] for s in samples]
+            growth = last["rss_mb"] - first["rss_mb"]
+            slope = slope_per_hour(times, [s["rss_mb"] for s in samples])
+            summary["rss_mb"] = {"start": first["rss_mb"], "end": last["rss_mb"], "growth": round(growth, 2), "slope_per_hour": round(slope, 2)}
+            summary["traced_mb"] = {"start": first["traced_mb"], "end": last["traced_mb"], "slope_per_hour": round(slope_per_hour(times, [s["traced_mb"] for s in samples]), 2)}
+            if growth > max_rss_growth_mb:
+                failures.append(f"RSS grew {growth:.1f} MB after warm-up (limit {max_rss_growth_mb} MB)")
+            # The slope only means something once the run is long enough to average out GC and allocator noise.
+            if times[-1] - times[0] >= 600 and slope > max_rss_slope_mb:
+                failures.append(f"RSS trend {slope:.1f} MB/h (limit {max_rss_slope_mb} MB/h)")
+
+            k = max(1, min(3, len(samples) // 3))
+            early = float(np.median([s["frame_ms"]["p95"] for s in samples[:k]]))
+            late = float(np.median([s["frame_ms"]["p95"] for s in samples[-k:]]))
+            drift = late / early if early > 0 else 1.0
+            summary["frame_p95_ms"] = {"start": round(early, 3), "end": round(late, 3), "drift": round(drift, 3)}
+            if drift > max_frame_drift:
+                failures.append(f"frame p95 drifted {early:.2f} -> {late:.2f} ms (x{drift:.2f}, limit x{max_frame_drift})")
+        else:
+            failures.append("not enough samples after warm-up; run longer or lower --interval/--warmup")
+        summary["top_growth"] = self.growth
+        self.out.write(json.dumps({"summary": summary}) + "\n")
+        self.out.flush()
+        tracemalloc.stop()
+        return summary
+
+
+def soak_headless(cfg: Config, monitor: SoakMonitor, seconds: float, rounds: int | None, seed: int | None):
+    step_dt = cfg.physics_dt
+    played = frames = 0
+    deadline = time.perf_counter() + seconds
+    sim = None
+    while (rounds is None or played < rounds) and time.perf_counter() < deadline:
+        sim = Simulation(cfg, None if seed is None else seed + played, recycle=sim)
+        while not sim.round_over():
+            t = time.perf_counter_ns()
+            sim.step(step_dt)
+            monitor.frame(time.perf_counter_ns() - t)
+            frames += 1
+            if monitor.due():
+                monitor.sample(
+                    played,
+                    frames,
+                    blocks=len(sim.blocks),
+                    chunk_pool=len(sim.blocks.pool),
+                    particles=len(sim.particles),
+                    queue=len(sim.command_queue),
+                )
+        sim.close()
+        played += 1
+    return played, frames
+
+
+def soak_rendered(cfg: Config, monitor: SoakMonitor, seconds: float, rounds: int | None, seed: int | None):
+    import pygame
+
+    from pyminer.game import Game
+
+    # The same per-frame calls as Game.run (input, update, render, governor, idle-time terrain), but unpaced
+    # so hours of frames fit in less time.
+    game = Game(cfg, seed)
+    # The run keeps the config it started with, like its seeds.
+    game.config_watcher = None
+    step_dt = cfg.physics_dt
+    played = frames = ended_frames = 0
+    deadline = time.perf_counter() + seconds
+    try:
+        while (rounds is None or played < rounds) and time.perf_counter() < deadline:
+            frame_start = time.perf_counter()
+            t = time.perf_counter_ns()
+            game.profiler.start_frame()
+            pygame.event.pump()
+            game.poll_input()
+            game.profiler.lap("input")
+            steps = game.update(step_dt)
+            game.render(steps)
+            game.profiler.lap("draw")
+            game.update_quality(step_dt, frame_start)
+            game.end_frame(steps)
+            monitor.frame(time.perf_counter_ns() - t)
+            game.build_ahead(frame_start + cfg.frame_dt * 0.75)
+            frames += 1
+            sim = game.sim
+            if monitor.due():
+                monitor.sample(
+                    played,
+                    frames,
+                    blocks=len(sim.blocks),
+                    chunk_pool=len(sim.blocks.pool),
+                    particles=len(sim.particles),
+                    queue=len(sim.command_queue),
+                    text_cache=len(game.text_cache.entries),
+                )
+            if sim.round_over():
+                # Leave the result screen up for a while, then restart as a player pressing R would.
+                ended_frames += 1
+                if ended_frames * step_dt >= RESULT_SCREEN_SECONDS:
+                    played += 1
+                    ended_frames = 0
+                    game.handle_key(pygame.K_r)
+    finally:
+        game.close()
+        pygame.quit()
+    return played, frames
+
+
+def run_soak(
+    cfg: Config,
+    out_path: Path,
+    seconds: float,
+    rounds: int | None = None,
+    rendered: bool = False,
+    seed: int | None = None,
+    interval: float = 30.0,
+    warmup: float = 60.0,
+    top: int = 15,
+    trace_frames: int = 1,
+    max_rss_growth_mb: float = 64.0,
+    max_rss_slope_mb: float = 16.0,
+    max_frame_drift: float = 1.5,
+) -> dict:
+    cfg = cfg.with_overrides(SOAK_OVERRIDES, "soak")
+    with out_path.open("w", encoding="utf-8") as out:
+        out.write(json.dumps({"soak": {"rendered": rendered, "seed": seed, "interval": interval, "warmup": warmup}}) + "\n")
+        monitor = SoakMonitor(out, interval, warmup, top, trace_frames)
+        run = soak_rendered if rendered else soak_headless
+        played, frames = run(cfg, monitor, seconds, rounds, seed)
+        # A final sample so the report always covers the end of the run.
+        monitor.sample(played, frames)
+        summary = monitor.report(max_rss_growth_mb, max_rss_slope_mb, max_frame_drift)
+    summary["rounds"] = played
+    summary["frames"] = frames
+    return summary
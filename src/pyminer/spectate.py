@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import mimetypes
+import select
+import socket
+import socketserver
+import struct
+import threading
+from collections import deque
+from pathlib import Path
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def ws_accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+
+def ws_frame(payload: bytes, opcode: int = OP_BINARY) -> bytes:
+    size = len(payload)
+    if size < 126:
+        head = struct.pack("!BB", 0x80 | opcode, size)
+    elif size < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, size)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, size)
+    return head + payload
+
+
+def _read_exact(rfile, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = rfile.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def ws_read_frame(rfile) -> tuple[int, bytes] | None:
+    head = _read_exact(rfile, 2)
+    if len(head) < 2:
+        return None
+    opcode, size = head[0] & 0x0F, head[1] & 0x7F
+    if size == 126:
+        (size,) = struct.unpack("!H", _read_exact(rfile, 2))
+    elif size == 127:
+        (size,) = struct.unpack("!Q", _read_exact(rfile, 8))
+    mask = _read_exact(rfile, 4) if head[1] & 0x80 else b""
+    payload = _read_exact(rfile, size)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class Spectator:
+    def __init__(self, address: str):
+        self.address = address
+        self.queue: deque[bytes] = deque()
+        self.wake = threading.Event()
+        self.stale = False
+        self.resyncs = 0
+        self.sent_bytes = 0
+
+
+class SpectatorHub:
+    def __init__(self, client_queue: int = 256):
+        self.client_queue = client_queue
+        # Same handoff as chat ingest: the simulation thread only appends, the fan-out thread pops.
+        self.inbox: deque[tuple[bytes | None, bytes | None]] = deque(maxlen=4096)
+        self.keyframe: bytes | None = None
+        self.since_keyframe: list[bytes] = []
+        self.spectators: set[Spectator] = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="spectator-fanout", daemon=True)
+        self.published = 0
+        self.overflows = 0
+        # Set by the producer when a full inbox pushed out a message; the fan-out thread then resyncs everyone.
+        self.overflowed = False
+        # Read by the producer: send a keyframe with the next delta, the broken delta chain can't be patched.
+        self.keyframe_wanted = False
+
+    def start(self) -> SpectatorHub:
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+        self.thread.join(timeout=1.0)
+
+    def publish(self, delta: bytes | None, keyframe: bytes | None = None):
+        # A keyframe alone (round start) is broadcast; next to a delta it is only kept for late joiners.
+        inbox = self.inbox
+        if len(inbox) == inbox.maxlen:
+            self.overflowed = True
+        if keyframe is not None:
+            self.keyframe_wanted = False
+        inbox.append((delta, keyframe))
+        self.wake.set()
+
+    def catch_up(self) -> list[bytes]:
+        return [self.keyframe, *self.since_keyframe] if self.keyframe is not None else []
+
+    def join(self, address: str) -> Spectator:
+        spectator = Spectator(address)
+        with self.lock:
+            spectator.queue.extend(self.catch_up())
+            spectator.stale = self.keyframe is None
+            self.spectators.add(spectator)
+        spectator.wake.set()
+        return spectator
+
+    def leave(self, spectator: Spectator):
+        with self.lock:
+            self.spectators.discard(spectator)
+
+    def _run(self):
+        inbox = self.inbox
+        while not self.stop_event.is_set():
+            self.wake.wait(0.5)
+            self.wake.clear()
+            while inbox:
+                try:
+                    delta, keyframe = inbox.popleft()
+                except IndexError:
+                    break
+                if self.overflowed:
+                    self.overflowed = False
+                    self._resync()
+                self._fan_out(delta, keyframe)
+
+    def _resync(self):
+        # Every message still queued comes after the one that was dropped, so no spectator can apply them.
+        with self.lock:
+            self.keyframe = None
+            self.since_keyframe = []
+            for spectator in self.spectators:
+                spectator.queue.clear()
+                spectator.stale = True
+                spectator.resyncs += 1
+            self.overflows += 1
+            self.keyframe_wanted = True
+
+    def _fan_out(self, delta: bytes | None, keyframe: bytes | None):
+        with self.lock:
+            if keyframe is not None:
+                self.keyframe = keyframe
+                self.since_keyframe = []
+            elif delta is not None:
+                self.since_keyframe.append(delta)
+            message = delta if delta is not None else keyframe
+            for spectator in self.spectators:
+                queue = spectator.queue
+                if spectator.stale:
+                    # The keyframe holds the same tick as the delta beside it, so it replaces the backlog.
+                    if keyframe is None:
+                        continue
+                    spectator.stale = False
+                    queue.append(keyframe)
+                elif len(queue) >= self.client_queue:
+                    # Too far behind to apply deltas; drop the backlog and wait for the next keyframe.
+                    queue.clear()
+                    spectator.stale = True
+                    spectator.resyncs += 1
+                    continue
+                else:
+                    queue.append(message)
+                spectator.wake.set()
+            self.published += 1
+
+
+class SpectatorServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], hub: SpectatorHub, web_root: Path, send_timeout: float = 5.0):
+        self.hub = hub
+        self.web_root = web_root.resolve()
+        self.send_timeout = send_timeout
+        self.stopping = threading.Event()
+        super().__init__(address, SpectatorHandler)
+
+    def start(self) -> SpectatorServer:
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.2}, name="spectator-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
+
+
+class SpectatorHandler(socketserver.StreamRequestHandler):
+    server: SpectatorServer
+    # Unbuffered, so select() on the socket sees every client frame that has not been read yet.
+    rbufsize = 0
+
+    def handle(self):
+        request = self.rfile.readline(4096).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = self.rfile.readline(4096).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if len(request) < 2 or request[0] != "GET":
+            self.respond(405, b"method not allowed")
+        elif headers.get("upgrade", "").lower() == "websocket" and "sec-websocket-key" in headers:
+            self.stream(headers["sec-websocket-key"])
+        else:
+            self.serve_file(request[1])
+
+    def respond(self, status: int, body: bytes, content_type: str = "text/plain; charset=utf-8"):
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        head = f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        self.wfile.write(head.encode("latin-1") + body)
+
+    def serve_file(self, target: str):
+        name = target.split("?", 1)[0].lstrip("/") or "spectate.html"
+        root = self.server.web_root
+        path = (root / name).resolve()
+        if not path.is_relative_to(root) or not path.is_file():
+            self.respond(404, b"not found")
+            return
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.respond(200, path.read_bytes(), content_type)
+
+    def stream(self, key: str):
+        self.wfile.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {ws_accept_key(key)}\r\n\r\n"
+            ).encode("latin-1")
+        )
+        sock = self.connection
+        sock.settimeout(self.server.send_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        hub = self.server.hub
+        spectator = hub.join(f"{self.client_address[0]}:{self.client_address[1]}")
+        try:
+            while not self.server.stopping.is_set():
+                spectator.wake.wait(0.25)
+                spectator.wake.clear()
+                batch = []
+                queue = spectator.queue
+                while queue:
+                    try:
+                        batch.append(ws_frame(queue.popleft()))
+                    except IndexError:
+                        break
+                if batch:
+                    data = b"".join(batch)
+                    sock.sendall(data)
+                    spectator.sent_bytes += len(data)
+                if select.select([sock], [], [], 0)[0] and not self.read_control(sock):
+                    return
+        except OSError:
+            pass
+        finally:
+            hub.leave(spectator)
+
+    def read_control(self, sock: socket.socket) -> bool:
+        frame = ws_read_frame(self.rfile)
+        if frame is None:
+            return False
+        opcode, payload = frame
+        if opcode == OP_CLOSE:
+            sock.sendall(ws_frame(payload[:2], OP_CLOSE))
+            return False
+        if opcode == OP_PING:
+            sock.sendall(ws_frame(payload, OP_PONG))
+        return True
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from pyminer.world import EMPTY, HARD, HAZARD, NORMAL, ORE, max_hp_by_kind
+
+
+class ChunkData:
+    __slots__ = ("index", "first_row", "kind", "hp")
+
+    def __init__(self, index: int, first_row: int, kind: np.ndarray, hp: np.ndarray):
+        self.index = index
+        self.first_row = first_row
+        self.kind = kind
+        self.hp = hp
+
+
+class TerrainGenerator:
+    def __init__(
+        self,
+        seed: int,
+        chunk_rows: int,
+        cols: int,
+        block_hp: int,
+        top_clear_rows: int,
+        prefetch_chunks: int = 0,
+    ):
+        self.seed = seed
+        self.chunk_rows = chunk_rows
+        self.cols = cols
+        self.top_clear_rows = top_clear_rows
+        self.hp_table = np.array(max_hp_by_kind(block_hp), dtype=np.uint8)
+        self.prefetch_chunks = prefetch_chunks
+        # Chunks are built ahead on the caller's thread in idle time (build_ahead), not on a worker:
+        # a build is ~0.2 ms of NumPy, and handing the GIL back and forth with a worker cost the frame far more.
+        self.ready: dict[int, ChunkData] = {}
+        self.ahead_from = 0
+        self.ahead_until = 0
+
+    def build(self, index: int) -> ChunkData:
+        # Each chunk has its own seed, so any chunk can be rebuilt without storing it.
+        rng = np.random.default_rng([self.seed, index])
+        roll = rng.random((self.chunk_rows, self.cols))
+        kind = np.full(roll.shape, NORMAL, dtype=np.uint8)
+        kind[roll > 0.70] = HARD
+        kind[roll > 0.82] = ORE
+        kind[roll > 0.93] = HAZARD
+        kind[roll < 0.20] = EMPTY
+        first_row = index * self.chunk_rows
+        if first_row < self.top_clear_rows:
+            kind[: self.top_clear_rows - first_row] = EMPTY
+        return ChunkData(index, first_row, kind, self.hp_table[kind])
+
+    def prefetch(self, index: int):
+        if self.prefetch_chunks > 0:
+            self.ahead_from = max(self.ahead_from, index)
+            self.ahead_until = max(self.ahead_until, index + self.prefetch_chunks)
+
+    def warm(self, count: int):
+        # Queues the first chunks of a round that has not started yet, e.g. behind a result screen.
+        self.ahead_until = max(self.ahead_until, count)
+
+    def build_ahead(self, deadline: float) -> int:
+        built = 0
+        while self.ahead_from < self.ahead_until and time.perf_counter() < deadline:
+            index = self.ahead_from
+            if index not in self.ready:
+                self.ready[index] = self.build(index)
+                built += 1
+            self.ahead_from += 1
+        return built
+
+    def take(self, index: int) -> ChunkData:
+        data = self.ready.pop(index, None)
+        if data is None:
+            data = self.build(index)
+        for stale in [i for i in self.ready if i < index]:
+            del self.ready[stale]
+        self.ahead_from = max(self.ahead_from, index + 1)
+        self.prefetch(index + 1)
+        return data
+
+    def close(self):
+        self.ready.clear()
+        self.ahead_from = self.ahead_until = 0
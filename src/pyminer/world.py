@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterator
+
+import numpy as np
+
+EMPTY, NORMAL, HARD, ORE, HAZARD = range(5)
+KIND_NAMES = ("", "normal", "hard", "ore", "hazard")
+KIND_GAIN = (0, 4, 8, 20, 8)
+
+
+def max_hp_by_kind(block_hp: int) -> list[int]:
+    return [0, block_hp, block_hp + 1, block_hp, 2]
+
+
+class Chunk:
+    __slots__ = ("index", "first_row", "kind", "hp", "hit_at", "count")
+
+    def __init__(self, rows: int, cols: int):
+        self.index = -1
+        self.first_row = 0
+        self.kind = np.zeros((rows, cols), dtype=np.uint8)
+        self.hp = np.zeros((rows, cols), dtype=np.uint8)
+        self.hit_at = np.full((rows, cols), -99.0, dtype=np.float32)
+        self.count = 0
+
+    def reset(self, index: int, rows: int):
+        self.index = index
+        self.first_row = index * rows
+        self.count = 0
+        self.kind.fill(EMPTY)
+        self.hp.fill(0)
+        self.hit_at.fill(-99.0)
+
+
+class BlockGrid:
+    def __init__(self, cols: int, block_size: int, chunk_rows: int = 8):
+        self.cols = cols
+        self.block_size = block_size
+        self.chunk_rows = chunk_rows
+        self.chunks: deque[Chunk] = deque()
+        self.by_index: dict[int, Chunk] = {}
+        self.pool: list[Chunk] = []
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _chunk_for_row(self, row: int) -> Chunk:
+        index = row // self.chunk_rows
+        chunk = self.by_index.get(index)
+        if chunk is None:
+            if self.chunks and index < self.chunks[-1].index:
+                raise ValueError(f"row {row} is behind the generated world")
+            chunk = self.pool.pop() if self.pool else Chunk(self.chunk_rows, self.cols)
+            chunk.reset(index, self.chunk_rows)
+            self.chunks.append(chunk)
+            self.by_index[index] = chunk
+        return chunk
+
+    def install(self, first_row: int, kind: np.ndarray, hp: np.ndarray):
+        chunk = self._chunk_for_row(first_row)
+        self.count -= chunk.count
+        chunk.kind[:] = kind
+        chunk.hp[:] = hp
+        chunk.hit_at.fill(-99.0)
+        chunk.count = int(np.count_nonzero(kind))
+        self.count += chunk.count
+
+    def chunk_at(self, row: int) -> Chunk | None:
+        return self.by_index.get(row // self.chunk_rows)
+
+    def kind_at(self, col: int, row: int) -> int:
+        chunk = self.by_index.get(row // self.chunk_rows)
+        if chunk is None or not 0 <= col < self.cols:
+            return EMPTY
+        return chunk.kind.item(row - chunk.first_row, col)
+
+    def clear(self, chunk: Chunk, local_row: int, col: int):
+        if chunk.kind.item(local_row, col) != EMPTY:
+            chunk.kind[local_row, col] = EMPTY
+            chunk.hp[local_row, col] = 0
+            chunk.count -= 1
+            self.count -= 1
+
+    def evict_above(self, row: int) -> int:
+        evicted = 0
+        while self.chunks and self.chunks[0].first_row + self.chunk_rows <= row:
+            chunk = self.chunks.popleft()
+            del self.by_index[chunk.index]
+            self.count -= chunk.count
+            chunk.reset(-1, self.chunk_rows)
+            self.pool.append(chunk)
+            evicted += 1
+        return evicted
+
+    def reset(self):
+        self.evict_above(self.chunks[-1].first_row + self.chunk_rows if self.chunks else 0)
+
+    def cell_range(self, left: float, top: float, right: float, bottom: float) -> tuple[int, int, int, int]:
+        bs = self.block_size
+        c0 = max(0, int(left // bs))
+        c1 = min(self.cols - 1, int(right // bs))
+        return c0, c1, int(top // bs), int(bottom // bs)
+
+    def any_solid(self, c0: int, c1: int, r0: int, r1: int) -> bool:
+        for chunk, lo, hi in self.chunks_in_rows(r0, r1):
+            if chunk.kind[lo:hi, c0 : c1 + 1].any():
+                return True
+        return False
+
+    def chunks_in_rows(self, first_row: int, last_row: int) -> Iterator[tuple[Chunk, int, int]]:
+        for index in range(first_row // self.chunk_rows, last_row // self.chunk_rows + 1):
+            chunk = self.by_index.get(index)
+            if chunk is None or not chunk.count:
+                continue
+            lo = max(first_row, chunk.first_row) - chunk.first_row
+            hi = min(last_row + 1, chunk.first_row + self.chunk_rows) - chunk.first_row
+            yield chunk, lo, hi
+
+    def window(self, first_row: int, kind: np.ndarray, hp: np.ndarray):
+        # Dense copy of rows [first_row, first_row + len(kind)) into caller-owned arrays.
+        kind.fill(EMPTY)
+        hp.fill(0)
+        for chunk, lo, hi in self.chunks_in_rows(first_row, first_row + len(kind) - 1):
+            dst = chunk.first_row + lo - first_row
+            kind[dst : dst + hi - lo] = chunk.kind[lo:hi]
+            hp[dst : dst + hi - lo] = chunk.hp[lo:hi]
+
+    def occupied_in_rows(self, first_row: int, last_row: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        rows, cols, kinds, hps = [], [], [], []
+        for chunk, lo, hi in self.chunks_in_rows(first_row, last_row):
+            kind = chunk.kind[lo:hi]
+            r, c = np.nonzero(kind)
+            rows.append(r + (chunk.first_row + lo))
+            cols.append(c)
+            kinds.append(kind[r, c])
+            hps.append(chunk.hp[lo:hi][r, c])
+        if not rows:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(kinds), np.concatenate(hps)
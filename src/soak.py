@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from pyminer.config import ConfigError, load_config
+from pyminer.soak import run_soak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyminer long-run soak test (AUTO_MODE)")
+    parser.add_argument("--minutes", type=float, default=60.0, help="wall-clock time to run")
+    parser.add_argument("--rounds", type=int, default=None, help="stop after this many rounds instead")
+    parser.add_argument("--render", action="store_true", help="run full Game frames (draw, HUD, reset) instead of the bare simulation")
+    parser.add_argument("--window", action="store_true", help="with --render, open a real window instead of the dummy video driver")
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed (rounds use seed, seed+1, ...)")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between samples")
+    parser.add_argument("--warmup", type=float, default=60.0, help="seconds before the memory baseline is taken")
+    parser.add_argument("--top", type=int, default=15, help="allocation sites to report")
+    parser.add_argument("--trace-frames", type=int, default=1, help="stack depth recorded per allocation site")
+    parser.add_argument("--max-rss-growth", type=float, default=64.0, help="fail if RSS grows more than this many MB after warm-up")
+    parser.add_argument("--max-rss-slope", type=float, default=16.0, help="fail if the RSS trend exceeds this many MB/hour")
+    parser.add_argument("--max-frame-drift", type=float, default=1.5, help="fail if frame p95 at the end exceeds the start by this ratio")
+    parser.add_argument("--out", type=Path, default=Path("soak.jsonl"), help="JSONL report: one line per sample, then a summary")
+    args = parser.parse_args()
+
+    try:
+        cfg = load_config()
+    except ConfigError as e:
+        parser.error(str(e))
+    if args.render and not args.window:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    summary = run_soak(
+        cfg,
+        args.out,
+        args.minutes * 60,
+        args.rounds,
+        args.render,
+        args.seed,
+        args.interval,
+        args.warmup,
+        args.top,
+        args.trace_frames,
+        args.max_rss_growth,
+        args.max_rss_slope,
+        args.max_frame_drift,
+    )
+    print(f"{summary['rounds']} rounds, {summary['frames']} frames, {summary['samples']} samples -> {args.out}")
+    if "rss_mb" in summary:
+        rss, frame = summary["rss_mb"], summary["frame_p95_ms"]
+        print(f"RSS {rss['start']} -> {rss['end']} MB ({rss['slope_per_hour']:+.1f} MB/h), frame p95 {frame['start']} -> {frame['end']} ms")
+    for site in summary["top_growth"][:5]:
+        print(f"  +{site['size_diff_kb']:>9.1f} KiB {site['count_diff']:+7d}  {site['site']}")
+    for line in summary["failures"]:
+        print(f"SOAK FAIL {line}", file=sys.stderr)
+    if summary["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from pyminer.balance import expand_grid, parse_param, sweep
+from pyminer.config import ConfigError, load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyminer balance sweep")
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="KEY=VALUES",
+        help="config key to sweep, as a,b,c or start:stop:step (repeatable)",
+    )
+    parser.add_argument("--rounds", type=int, default=50, help="seeded headless rounds per config")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; every config uses the same seeds")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", type=Path, default=Path("sweep.csv"), help="output file, .csv or .jsonl")
+    args = parser.parse_args()
+
+    try:
+        cfg = load_config()
+    except ConfigError as e:
+        parser.error(str(e))
+    try:
+        params = [parse_param(spec) for spec in args.param]
+    except ValueError as e:
+        parser.error(str(e))
+    total = sum(1 for _ in expand_grid(params))
+
+    started = time.perf_counter()
+    try:
+        done = sweep(cfg, params, args.rounds, args.seed, args.out, args.workers)
+    except ConfigError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+    print(f"{done}/{total} configs x {args.rounds} rounds in {elapsed:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+// Spectator view for `python src/main.py --serve`: applies the server's keyframes and per-tick deltas
+// (see src/pyminer/netstate.py for the layout) and draws them. Nothing is simulated here.
+const cvs = document.getElementById('game');
+const ctx = cvs.getContext('2d');
+const statusEl = document.getElementById('status');
+
+const MSG_KEYFRAME = 0x01;
+const MSG_DELTA = 0x02;
+const HEADER_SIZE = 5;
+const ROUND_SIZE = 24;
+const FRAME_SIZE = 50;
+const CELL_SIZE = 6;
+
+const FLAG_SHIELD = 0x01;
+const FLAG_BOOST = 0x02;
+const FLAG_SLOW = 0x04;
+const FLAG_BIG = 0x08;
+const FLAG_INVULN = 0x10;
+const FLAG_SPONSOR_CARD = 0x20;
+const FLAG_ENDED = 0x40;
+const FLAG_GAME_OVER = 0x80;
+
+// Indexed by block kind: empty, normal, hard, ore, hazard (pyminer.world).
+const BLOCK_COLORS = [null, [90, 97, 114], [125, 92, 70], [58, 175, 230], [175, 52, 52]];
+const DEBRIS_COLORS = [null, '#d8dbe8', '#b88a64', '#57d3ff', '#ff6666'];
+const MAX_PARTICLES = 400;
+
+const textDecoder = new TextDecoder();
+
+let round = null;
+let frame = null;
+let hud = { recent: [], skill: '-', top: [] };
+let kind = null;
+let hp = null;
+let maxHp = null;
+let tick = -1;
+let synced = false;
+let particles = [];
+let bgGradient = null;
+
+function readFrame(view, p) {
+  return {
+    firstRow: view.getInt32(p, true),
+    playerX: view.getFloat32(p + 4, true),
+    playerY: view.getFloat32(p + 8, true),
+    cameraY: view.getFloat64(p + 12, true),
+    playerVx: view.getFloat32(p + 20, true),
+    radius: view.getFloat32(p + 24, true),
+    shake: view.getFloat32(p + 28, true),
+    flash: view.getFloat32(p + 32, true),
+    hp: view.getInt8(p + 36),
+    flags: view.getUint8(p + 37),
+    score: view.getUint32(p + 38, true),
+    depth: view.getUint32(p + 42, true),
+    remaining: view.getUint32(p + 46, true),
+  };
+}
+
+function readText(view, buf, p) {
+  const n = view.getUint16(p, true);
+  if (n) hud = JSON.parse(textDecoder.decode(new Uint8Array(buf, p + 2, n)));
+  return p + 2 + n;
+}
+
+function applyKeyframe(view, buf, p) {
+  round = {
+    cols: view.getUint16(p + 8, true),
+    rows: view.getUint16(p + 10, true),
+    block: view.getUint16(p + 12, true),
+    width: view.getUint16(p + 14, true),
+    height: view.getUint16(p + 16, true),
+    seconds: view.getFloat32(p + 20, true),
+  };
+  // Same table as pyminer.world.max_hp_by_kind.
+  const blockHp = view.getUint16(p + 18, true);
+  maxHp = [0, blockHp, blockHp + 1, blockHp, 2];
+  p += ROUND_SIZE;
+  if (cvs.width !== round.width || cvs.height !== round.height) {
+    cvs.width = round.width;
+    cvs.height = round.height;
+    bgGradient = null;
+  }
+  frame = readFrame(view, p);
+  p += FRAME_SIZE;
+  const n = round.rows * round.cols;
+  kind = new Uint8Array(buf.slice(p, p + n));
+  hp = new Uint8Array(buf.slice(p + n, p + 2 * n));
+  particles = [];
+  return readText(view, buf, p + 2 * n);
+}
+
+function applyDelta(view, buf, p) {
+  const next = readFrame(view, p);
+  p += FRAME_SIZE;
+  const cols = round.cols;
+  const rows = round.rows;
+  const shift = next.firstRow - frame.firstRow;
+  if (shift) {
+    // Rows that stay in view move with the window; rows entering it follow below.
+    const k = new Uint8Array(rows * cols);
+    const h = new Uint8Array(rows * cols);
+    const lo = Math.max(0, shift);
+    const hi = Math.min(rows, rows + shift);
+    if (lo < hi) {
+      k.set(kind.subarray(lo * cols, hi * cols), (lo - shift) * cols);
+      h.set(hp.subarray(lo * cols, hi * cols), (lo - shift) * cols);
+    }
+    kind = k;
+    hp = h;
+  }
+  frame = next;
+
+  const cells = view.getUint16(p, true);
+  p += 2;
+  for (let i = 0; i < cells; i++, p += CELL_SIZE) {
+    const idx = view.getUint16(p, true) * cols + view.getUint16(p + 2, true);
+    const newKind = view.getUint8(p + 4);
+    if (kind[idx] && !newKind) breakParticles(idx, kind[idx]);
+    kind[idx] = newKind;
+    hp[idx] = view.getUint8(p + 5);
+  }
+  const fresh = view.getUint16(p, true);
+  p += 2;
+  for (let i = 0; i < fresh; i++) {
+    const row = view.getUint16(p, true);
+    kind.set(new Uint8Array(buf, p + 2, cols), row * cols);
+    hp.set(new Uint8Array(buf, p + 2 + cols, cols), row * cols);
+    p += 2 + 2 * cols;
+  }
+  return readText(view, buf, p);
+}
+
+function onMessage(buf) {
+  const view = new DataView(buf);
+  const type = view.getUint8(0);
+  const msgTick = view.getUint32(1, true);
+  if (type === MSG_KEYFRAME) {
+    applyKeyframe(view, buf, HEADER_SIZE);
+    synced = true;
+  } else if (type === MSG_DELTA && synced) {
+    if (msgTick !== tick + 1) {
+      // Missed a delta; the server restarts slow spectators from a keyframe, so wait for it.
+      synced = false;
+      return;
+    }
+    applyDelta(view, buf, HEADER_SIZE);
+  } else {
+    return;
+  }
+  tick = msgTick;
+}
+
+function breakParticles(idx, k) {
+  if (particles.length > MAX_PARTICLES) return;
+  const bs = round.block;
+  const x = (idx % round.cols) * bs + bs / 2;
+  const y = (frame.firstRow + Math.floor(idx / round.cols)) * bs + bs / 2;
+  for (let i = 0; i < 10; i++) {
+    const a = Math.random() * Math.PI * 2;
+    const s = 40 + Math.random() * 160;
+    particles.push({ x, y, vx: Math.cos(a) * s, vy: Math.sin(a) * s, life: 0.2 + Math.random() * 0.3, color: DEBRIS_COLORS[k] });
+  }
+}
+
+function updateParticles(dt) {
+  let w = 0;
+  for (const p of particles) {
+    p.life -= dt;
+    if (p.life <= 0) continue;
+    p.vy += 420 * dt;
+    p.x += p.vx * dt;
+    p.y += p.vy * dt;
+    particles[w++] = p;
+  }
+  particles.length = w;
+}
+
+function shade(rgb, f) {
+  return `rgb(${Math.round(rgb[0] * f)},${Math.round(rgb[1] * f)},${Math.round(rgb[2] * f)})`;
+}
+
+function drawBlocks(ox, oy) {
+  const bs = round.block;
+  const cols = round.cols;
+  const size = bs - 2;
+  const cam = Math.floor(frame.cameraY) - oy;
+  for (let r = 0; r < round.rows; r++) {
+    const y = (frame.firstRow + r) * bs - cam;
+    if (y < -bs || y > cvs.height) continue;
+    for (let c = 0; c < cols; c++) {
+      const k = kind[r * cols + c];
+      if (!k) continue;
+      const damage = 1 - hp[r * cols + c] / maxHp[k];
+      ctx.fillStyle = shade(BLOCK_COLORS[k], 1 - 0.28 * damage);
+      ctx.beginPath();
+      ctx.roundRect(c * bs + ox, y, size, size, 6);
+      ctx.fill();
+    }
+  }
+}
+
+function drawPickaxe(ox, oy) {
+  const f = frame;
+  const px = f.playerX + ox;
+  const py = Math.floor(f.playerY) + oy;
+  const pr = Math.floor(f.radius);
+  const lean = Math.max(-10, Math.min(10, Math.floor(f.playerVx * 0.04)));
+  const blink = f.flags & FLAG_INVULN && Math.floor(performance.now() / 50) % 2;
+
+  ctx.strokeStyle = '#8a623a';
+  ctx.lineWidth = Math.max(8, Math.floor(pr / 3));
+  ctx.beginPath();
+  ctx.moveTo(px - pr / 2 + lean, py + pr / 2);
+  ctx.lineTo(px + pr / 2 + lean, py - pr / 2);
+  ctx.stroke();
+
+  const hx = px + pr / 2 + lean;
+  const hy = py - pr / 2;
+  ctx.fillStyle = blink ? '#ff8c8c' : '#c3d7ec';
+  ctx.beginPath();
+  ctx.moveTo(hx - pr / 5, hy - pr / 3);
+  ctx.lineTo(hx + pr, hy - pr / 6);
+  ctx.lineTo(hx + pr + pr / 5, hy + pr / 6);
+  ctx.lineTo(hx, hy + pr / 2);
+  ctx.fill();
+  ctx.beginPath();
+  ctx.moveTo(hx - pr / 3, hy - pr / 5);
+  ctx.lineTo(hx - pr - pr / 5, hy - pr / 2);
+  ctx.lineTo(hx - pr / 2, hy + pr / 3);
+  ctx.fill();
+
+  if (f.flags & FLAG_SHIELD) {
+    ctx.strokeStyle = '#6ee6ff';
+    ctx.lineWidth = 2;
+    ctx.beginPath();
+    ctx.arc(px, py, pr + 10, 0, Math.PI * 2);
+    ctx.stroke();
+  }
+}
+
+function drawHud() {
+  const f = frame;
+  const W = cvs.width;
+  ctx.fillStyle = '#ffffff';
+  ctx.font = 'bold 20px system-ui';
+  ctx.fillText(`SCORE ${f.score}`, 10, 30);
+  ctx.fillText(`TIME ${String(f.remaining).padStart(3, '0')}s   DEPTH ${f.depth}m   HP ${'♥'.repeat(Math.max(0, f.hp))}`, 10, 56);
+  ctx.fillText(`CHAT ${hud.recent.join(', ') || '-'}`, 10, 82);
+  ctx.fillText(`SKILL ${hud.skill}`, 10, 108);
+  ctx.fillText(`TOP ${hud.top.map(([u, c]) => `${u} ${c}`).join('  ') || '-'}`, 10, 134);
+
+  const ratio = round.seconds ? f.remaining / round.seconds : 0;
+  ctx.fillStyle = '#373c4b';
+  ctx.fillRect(20, cvs.height - 28, W - 40, 10);
+  ctx.fillStyle = '#50dc8c';
+  ctx.fillRect(20, cvs.height - 28, (W - 40) * ratio, 10);
+
+  if (f.flags & FLAG_SPONSOR_CARD) {
+    ctx.fillStyle = 'rgba(28,34,56,.86)';
+    ctx.fillRect(60, 152, W - 120, 72);
+    ctx.font = '16px system-ui';
+    ctx.fillStyle = '#91cdff';
+    ctx.fillText('SPONSOR SKILL ACTIVATED', 76, 176);
+    ctx.font = 'bold 20px system-ui';
+    ctx.fillStyle = '#ffffff';
+    ctx.fillText(hud.skill, 76, 206);
+  }
+
+  if (f.flags & FLAG_ENDED) {
+    const x = 40;
+    let y = Math.floor(cvs.height / 2 - 145);
+    ctx.fillStyle = 'rgba(20,24,42,.9)';
+    ctx.beginPath();
+    ctx.roundRect(x, y, W - 80, 290, 12);
+    ctx.fill();
+    ctx.fillStyle = '#ffffff';
+    ctx.font = 'bold 20px system-ui';
+    ctx.fillText(f.flags & FLAG_GAME_OVER ? 'GAME OVER' : 'TIME UP', x + 20, (y += 34));
+    ctx.fillText(`SCORE ${f.score}   DEPTH ${f.depth}m`, x + 20, (y += 30));
+    ctx.font = '16px system-ui';
+    ctx.fillStyle = '#c5d1ef';
+    hud.top.forEach(([u, c], i) => ctx.fillText(`${i + 1}. ${u}  ${c} pts`, x + 20, (y += 26)));
+    const skills = Object.entries(hud.skills || {}).map(([n, c]) => `${n} x${c}`).join(', ');
+    const commands = Object.entries(hud.commands || {}).map(([n, c]) => `${n} ${c}`).join('  ');
+    ctx.fillText(`SKILLS ${skills || '-'}`, x + 20, (y += 30));
+    ctx.fillText(`COMMANDS ${commands || '-'}`, x + 20, (y += 26));
+  }
+}
+
+function draw() {
+  const W = cvs.width;
+  const H = cvs.height;
+  if (!bgGradient) {
+    bgGradient = ctx.createLinearGradient(0, 0, 0, H);
+    bgGradient.addColorStop(0, 'rgb(10,14,28)');
+    bgGradient.addColorStop(1, 'rgb(35,44,73)');
+  }
+  ctx.fillStyle = bgGradient;
+  ctx.fillRect(0, 0, W, H);
+  if (!synced) return;
+
+  const shake = frame.shake;
+  const ox = shake > 0 ? Math.floor((Math.random() * 2 - 1) * shake) : 0;
+  const oy = shake > 0 ? Math.floor((Math.random() * 2 - 1) * shake) : 0;
+  drawBlocks(ox, oy);
+  drawPickaxe(ox, oy);
+
+  const cam = frame.cameraY - oy;
+  for (const p of particles) {
+    ctx.fillStyle = p.color;
+    ctx.fillRect(p.x + ox - 2, p.y - cam - 2, 4, 4);
+  }
+  if (frame.flash > 0) {
+    ctx.fillStyle = `rgba(255,245,230,${Math.min(1, (130 * frame.flash) / 255)})`;
+    ctx.fillRect(0, 0, W, H);
+  }
+  drawHud();
+}
+
+function connect() {
+  const params = new URLSearchParams(location.search);
+  const server = params.get('server') || location.host;
+  const ws = new WebSocket(`ws://${server}/ws`);
+  ws.binaryType = 'arraybuffer';
+  ws.onopen = () => { statusEl.textContent = `관전 중 · ${server}`; };
+  ws.onmessage = (e) => onMessage(e.data);
+  ws.onclose = () => {
+    synced = false;
+    tick = -1;
+    statusEl.textContent = '연결 끊김 · 재연결 중…';
+    setTimeout(connect, 1000);
+  };
+}
+
+let last = performance.now();
+function loop(now) {
+  const dt = Math.min(0.05, (now - last) / 1000);
+  last = now;
+  if (synced) updateParticles(dt);
+  draw();
+  requestAnimationFrame(loop);
+}
+
+connect();
+requestAnimationFrame(loop);